@@ -0,0 +1,351 @@
+## 性能基准测试
+# 运行全部：python benchmark.py
+# 只运行某几项：python benchmark.py raycast
+import sys
+import time
+
+import numpy as np
+
+from maze_data import maze_layout, CELL_SIZE
+
+
+def _timeit(func, repeat=5):
+    """运行 repeat 次，返回最快一次的耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_raycast():
+    """单条射线和批量射线（机器人视线检测）"""
+    from raycast import raycast, raycast_batch, line_of_sight_batch
+
+    grid = np.asarray(maze_layout, dtype=np.uint8)
+    rows, cols = grid.shape
+    rng = np.random.default_rng(0)
+
+    n = 4096
+    origins = np.column_stack([
+        rng.uniform(0, (cols - 1) * CELL_SIZE, n),
+        rng.uniform(0.5, 2.5, n),
+        rng.uniform(0, (rows - 1) * CELL_SIZE, n),
+    ])
+    directions = rng.normal(size=(n, 3))
+    targets = origins[rng.permutation(n)]
+
+    single = _timeit(lambda: [raycast(grid, origins[i], directions[i]) for i in range(256)])
+    batch = _timeit(lambda: raycast_batch(grid, origins, directions))
+    los = _timeit(lambda: line_of_sight_batch(grid, origins, targets))
+
+    print(f"raycast: single {single / 256 * 1e6:.1f} us/ray")
+    print(f"raycast: batch {n} rays {batch * 1e3:.2f} ms ({batch / n * 1e6:.2f} us/ray)")
+    print(f"raycast: line_of_sight_batch {n} pairs {los * 1e3:.2f} ms")
+
+
+def bench_mesh():
+    """材质分配和迷宫网格构建（随机 512x512 迷宫）"""
+    from materials import build_atlas
+    from maze_mesh import build_maze_mesh
+    from world import World
+
+    rng = np.random.default_rng(0)
+    layout = (rng.random((512, 512)) < 0.4).astype(np.uint8)
+    atlas, uv_rects = build_atlas()
+    materials = World.from_layout(layout, (1, 1), (510, 510)).cells
+
+    atlas_time = _timeit(build_atlas)
+    mesh_time = _timeit(lambda: build_maze_mesh(materials, uv_rects))
+    mesh = build_maze_mesh(materials, uv_rects)
+    print(f"mesh: atlas {atlas.shape[1]}x{atlas.shape[0]} {atlas_time * 1e3:.2f} ms")
+    print(f"mesh: 512x512 {mesh.quad_count} quads {mesh_time * 1e3:.1f} ms "
+          f"({mesh.vertices.nbytes / 1e6:.1f} MB)")
+
+
+def bench_bake():
+    """1024x1024 迷宫的光照烘焙（完整构建）和改动一个格子后的局部重新烘焙"""
+    from materials import build_atlas
+    from maze_mesh import build_maze_mesh, rebake_cell
+    from world import World, CELL_WALL, CELL_FLOOR
+
+    rng = np.random.default_rng(0)
+    size = 1024
+    layout = (rng.random((size, size)) < 0.4).astype(np.uint8)
+    world = World.from_layout(layout, (1, 1), (size - 2, size - 2))
+    _, uv_rects = build_atlas()
+
+    full = _timeit(lambda: build_maze_mesh(world.cells, uv_rects), repeat=3)
+    mesh = build_maze_mesh(world.cells, uv_rects)
+    print(f"bake: {size}x{size} full build {full * 1e3:.0f} ms, {mesh.quad_count} quads "
+          f"({mesh.vertices.nbytes / 1e6:.0f} MB)")
+
+    cells = rng.integers(1, size - 1, (50, 2))
+    times = []
+    repacks = 0
+    for x, z in cells:
+        world.cells[z, x] = CELL_FLOOR if world.cells[z, x] == CELL_WALL else CELL_WALL
+        vertices = mesh.vertices
+        start = time.perf_counter()
+        rebake_cell(mesh, world.cells, uv_rects, int(x), int(z))
+        times.append(time.perf_counter() - start)
+        repacks += mesh.vertices is not vertices
+    print(f"bake: rebake one cell median {np.median(times) * 1e3:.2f} ms, max {max(times) * 1e3:.2f} ms "
+          f"({repacks}/{len(cells)} needed a full repack)")
+
+
+def bench_validate():
+    """关卡批量校验吞吐（64x64 房间的迷宫），进程数从 1 加到 CPU 核数"""
+    import os
+    from validate_levels import validate
+
+    jobs = [("seed", seed, 64) for seed in range(400)]
+    counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for workers in counts:
+        start = time.perf_counter()
+        results = validate(jobs, workers)
+        elapsed = time.perf_counter() - start
+        per_maze = np.mean([r["analyze_ms"] for r in results])
+        print(f"validate: {workers} workers {len(jobs) / elapsed:.0f} mazes/s "
+              f"(analyze {per_maze:.1f} ms/maze)")
+
+
+def bench_minimap():
+    """小地图每帧开销（玩家每帧都换格子的最坏情况）随迷宫大小的变化（需要能创建 OpenGL 窗口）"""
+    import pygame
+    from pygame.locals import DOUBLEBUF, OPENGL
+    from OpenGL.GL import glFinish, glMatrixMode, glLoadIdentity, glOrtho, GL_PROJECTION, GL_MODELVIEW
+    from maze_data import generate_maze
+    from minimap import Minimap
+    from world import World
+
+    pygame.init()
+    try:
+        pygame.display.set_mode((800, 600), DOUBLEBUF | OPENGL)
+    except pygame.error:
+        print("minimap: 无法创建窗口，跳过")
+        return
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    glOrtho(0, 800, 0, 600, -1, 1)
+    glMatrixMode(GL_MODELVIEW)
+    glLoadIdentity()
+
+    for rooms in (4, 128, 1024):
+        world = World.from_layout(*generate_maze(rooms, rooms))
+        start = time.perf_counter()
+        minimap = Minimap(world)
+        glFinish()
+        build = time.perf_counter() - start
+
+        frames = 300
+        position = world.spawn_position()
+        times = []
+        for i in range(frames):
+            position[0] = (1 + i % (world.shape[1] - 2)) * world.cell_size
+            start = time.perf_counter()
+            minimap.update(position)
+            minimap.draw(position, i * 3.0, 800, 600)
+            glFinish()
+            times.append(time.perf_counter() - start)
+        rows, cols = world.shape
+        print(f"minimap: {rows}x{cols} build+upload {build * 1e3:.1f} ms, per frame "
+              f"median {np.median(times) * 1e3:.3f} ms p99 {np.percentile(times, 99) * 1e3:.3f} ms "
+              f"(upload {minimap.uploaded_texels} texels)")
+    pygame.quit()
+
+
+def bench_multiview():
+    """多视图渲染：4~16 个视图一次剔除、共用 VBO，每个视图的耗时（需要能创建 OpenGL 窗口）"""
+    import pygame
+    from pygame.locals import DOUBLEBUF, OPENGL
+    from camera import Camera
+    from materials import build_atlas
+    from maze_data import generate_maze
+    from maze_mesh import build_maze_mesh
+    from maze_renderer import MazeRenderer
+    from multiview import MultiViewRenderer, View, split_viewports
+    from render_target import RenderTarget, framebuffers_supported
+    from world import World
+
+    size = (800, 600)
+    pygame.init()
+    try:
+        pygame.display.set_mode(size, DOUBLEBUF | OPENGL)
+    except pygame.error:
+        print("multiview: 无法创建窗口，跳过")
+        return
+
+    world = World.from_layout(*generate_maze(128, 128))
+    atlas, uv_rects = build_atlas()
+    multiview = MultiViewRenderer(MazeRenderer(build_maze_mesh(world.cells, uv_rects), atlas))
+    chunk_count = len(multiview.maze_renderer.mesh.vertex_ranges)
+    rng = np.random.default_rng(0)
+    open_z, open_x = np.nonzero(world.cells != 1)
+
+    def make_views(count, thumbnails=False):
+        views = []
+        for viewport in split_viewports(count, *size):
+            i = rng.integers(len(open_x))
+            camera = Camera(position=np.array([open_x[i] * world.cell_size, 0.0, open_z[i] * world.cell_size],
+                                              dtype=np.float32), yaw=float(rng.uniform(0, 360)))
+            target = RenderTarget(160, 120) if thumbnails else None
+            views.append(View(camera, viewport, target=target))
+        return views
+
+    cases = [(count, False, False) for count in (1, 4, 9, 16)] + [(16, True, False)]
+    if framebuffers_supported():
+        cases.append((16, False, True))
+    for count, shared, thumbnails in cases:
+        views = make_views(count, thumbnails)
+        frames, cull, per_view, totals = 30, [], [], []
+        for _ in range(frames):
+            start = time.perf_counter()
+            plan = multiview.plan(views)
+            multiview.submit(plan, size, shared=shared, timed=True)
+            pygame.display.flip()
+            totals.append(time.perf_counter() - start)
+            cull.append(plan.cull_ms)
+            per_view.append([view.frame_ms for view in views])
+        per_view = np.asarray(per_view)
+        label = f"{count} views" + (" shared union" if shared else "") + (" 160x120 thumbnails" if thumbnails else "")
+        drawn = np.mean([view.drawn_chunks for view in views])
+        print(f"multiview: {label}: cull {np.median(cull):.2f} ms, frame {np.median(totals) * 1e3:.1f} ms, "
+              f"per view median {np.median(per_view):.2f} ms (max {per_view.max():.2f} ms), "
+              f"{drawn:.0f}/{chunk_count} chunks per view")
+    pygame.quit()
+
+
+def bench_world():
+    """世界数据的内存占用（tracemalloc）：4096x4096 的 World 对比原来每个方块一个数组的列表"""
+    import tracemalloc
+    from maze_data import create_maze
+    from camera import Camera
+    from world import World
+
+    rng = np.random.default_rng(0)
+    size = 4096
+    layout = (rng.random((size, size)) < 0.4).astype(np.uint8)
+
+    tracemalloc.start()
+    world = World.from_layout(layout, (1, 1), (size - 2, size - 2))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    cells = size * size
+    print(f"world: {size}x{size} World {current / 1e6:.1f} MB ({current / cells:.2f} B/cell), "
+          f"peak {peak / 1e6:.1f} MB")
+
+    # 方块列表在 4096x4096 上要好几 GB，用小迷宫按格子数折算
+    small = 256
+    small_layout = layout[:small, :small].tolist()
+    tracemalloc.start()
+    cubes = create_maze(small_layout)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_cell = current / (small * small)
+    print(f"world: create_maze {small}x{small} {len(cubes)} cubes {current / 1e6:.1f} MB "
+          f"({per_cell:.1f} B/cell, ~{per_cell * cells / 1e9:.1f} GB at {size}x{size})")
+    del cubes
+
+    camera = Camera(position=world.spawn_position(0.0))
+    around = _timeit(lambda: world.cubes_around(camera.position), repeat=200)
+    collide = _timeit(lambda: camera.check_collision(camera.position, world.cubes_around(camera.position)),
+                      repeat=200)
+    print(f"world: cubes_around {around * 1e6:.1f} us, cubes_around + check_collision {collide * 1e6:.1f} us")
+
+
+def bench_net():
+    """本机服务器 + 大量模拟客户端：每客户端带宽和服务器 tick 耗时"""
+    import asyncio
+    from net_client import simulate
+
+    for bots in (16, 64):
+        stats = asyncio.run(simulate(bots, 3.0))
+        print(f"net: {bots} clients down {stats['down_bytes_per_client_s']:.0f} B/s/client, "
+              f"up {stats['up_bytes_per_client_s']:.0f} B/s/client, "
+              f"tick mean {stats['tick_mean_ms']:.2f} ms p99 {stats['tick_p99_ms']:.2f} ms, "
+              f"corrections {stats['corrections']}")
+
+
+def bench_boot():
+    """启动耗时：关卡缓存冷/热读取，以及 main.py 到第一帧的时间（需要能创建 OpenGL 窗口）"""
+    import os
+    import subprocess
+    import tempfile
+    from level_cache import load_or_build_level
+    from materials import build_atlas
+    from maze_data import generate_maze
+    from world import World
+
+    world = World.from_layout(*generate_maze(256, 256))
+    _, uv_rects = build_atlas()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        load_or_build_level(world, uv_rects, cache_dir)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        _, hit = load_or_build_level(world, uv_rects, cache_dir)
+        warm = time.perf_counter() - start
+    print(f"boot: level 256x256 rooms cold {cold * 1e3:.1f} ms, warm {warm * 1e3:.1f} ms (hit={hit})")
+
+    main_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    runs = (("default", []), ("512 no-cache", ["--maze-size", "512", "--no-cache"]),
+            ("512 cached", ["--maze-size", "512"]), ("512 cached", ["--maze-size", "512"]))
+    # 用临时缓存目录，不往用户的 .level_cache/ 里写几百 MB
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label, extra in runs:
+            result = subprocess.run([sys.executable, main_py, "--boot-benchmark", "--cache-dir", cache_dir, *extra],
+                                    capture_output=True, text=True)
+            lines = [line for line in result.stdout.splitlines() if line.startswith("启动耗时")]
+            if result.returncode != 0 or not lines:
+                print(f"boot: {label} 无法启动窗口，跳过首帧测量")
+                return
+            print(f"boot: {label} {lines[-1]}")
+
+
+def bench_frame():
+    """跑固定帧数：p50/p99 帧耗时和自适应控制器最终选的分辨率、LOD 距离（需要能创建 OpenGL 窗口）"""
+    import json
+    import os
+    import subprocess
+
+    main_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    # 开着垂直同步也要跑一次：帧耗时不能把等 vblank 的时间算进去，空闲场景不应该被降级
+    runs = (("64 adaptive", ["--maze-size", "64", "--no-vsync"]),
+            ("64 fixed", ["--maze-size", "64", "--no-vsync", "--fixed-resolution"]),
+            ("64 adaptive vsync", ["--maze-size", "64"]))
+    for label, extra in runs:
+        result = subprocess.run([sys.executable, main_py, "--benchmark", "600", *extra],
+                                capture_output=True, text=True)
+        lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+        if result.returncode != 0 or not lines:
+            print(f"frame: {label} 无法启动窗口，跳过")
+            return
+        s = json.loads(lines[-1])
+        print(f"frame: {label} {s['frames']} frames p50 {s['p50_ms']:.2f} ms p99 {s['p99_ms']:.2f} ms "
+              f"(budget {s['budget_ms']:.2f} ms), scale {s['scale']} {s['resolution'][0]}x{s['resolution'][1]}, "
+              f"lod {s['lod_distance']}, decisions {s['decisions']}")
+
+
+BENCHMARKS = {
+    "raycast": bench_raycast,
+    "mesh": bench_mesh,
+    "bake": bench_bake,
+    "world": bench_world,
+    "validate": bench_validate,
+    "minimap": bench_minimap,
+    "multiview": bench_multiview,
+    "net": bench_net,
+    "boot": bench_boot,
+    "frame": bench_frame,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"未知的基准测试: {name}，可选: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        BENCHMARKS[name]()
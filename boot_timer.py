@@ -0,0 +1,31 @@
+## 启动阶段计时
+import time
+from contextlib import contextmanager
+
+
+class BootTimer:
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.phases = []  # [(阶段名, 耗时秒), ...]
+
+    @contextmanager
+    def phase(self, name):
+        """记录一个启动阶段的耗时"""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - begin))
+
+    def mark(self, name, begin):
+        """记录从 begin（perf_counter 时间）到现在的耗时"""
+        self.phases.append((name, time.perf_counter() - begin))
+
+    def elapsed(self):
+        """从开始到现在的总耗时（秒）"""
+        return time.perf_counter() - self.start
+
+    def report(self):
+        """一行文本：各阶段耗时和到首帧的总耗时"""
+        parts = [f"{name} {seconds * 1e3:.1f}ms" for name, seconds in self.phases]
+        return "启动耗时: " + " | ".join(parts) + f" | 首帧 {self.elapsed() * 1e3:.1f}ms"
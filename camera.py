@@ -59,39 +59,33 @@ class Camera:
         self.up /= np.linalg.norm(self.up)
 
     def check_collision(self, new_position, cubes):
-        """检查与方块的碰撞"""
+        """检查与方块的碰撞
+
+        cubes 是方块中心的 (K, 3) 数组（World.cubes_around 的结果），也可以是方块坐标列表
+        """
+        cubes = np.asarray(cubes, dtype=np.float32).reshape(-1, 3)
         player_min = new_position - np.array([self.player_radius, 0, self.player_radius])
         player_max = new_position + np.array([self.player_radius, self.player_height, self.player_radius])
 
-        for cube_pos in cubes:
-            # 每个方块大小为2x2x2，中心在cube_pos
-            cube_min = cube_pos - np.array([1, 1, 1])
-            cube_max = cube_pos + np.array([1, 1, 1])
-
-            # AABB碰撞检测
-            if (player_min[0] < cube_max[0] and player_max[0] > cube_min[0] and
-                    player_min[1] < cube_max[1] and player_max[1] > cube_min[1] and
-                    player_min[2] < cube_max[2] and player_max[2] > cube_min[2]):
-                return True
-        return False
+        # 每个方块大小为2x2x2，中心在cube_pos；所有方块一起做AABB碰撞检测
+        overlap = (player_min < cubes + 1) & (player_max > cubes - 1)
+        return bool(overlap.all(axis=1).any())
 
     def check_ground_collision(self, cubes):
         """检查脚下是否有地面（方块顶部）"""
+        cubes = np.asarray(cubes, dtype=np.float32).reshape(-1, 3)
         foot_y = self.position[1] - 0.1 # 脚的位置
 
-        for cube_pos in cubes:
-            cube_min = cube_pos - np.array([1, 1, 1])
-            cube_max = cube_pos + np.array([1, 1, 1])
-
-            # 检查玩家是否在方块的X,Z范围内
-            if (self.position[0] - self.player_radius < cube_max[0] and
-                    self.position[0] + self.player_radius > cube_min[0] and
-                    self.position[2] - self.player_radius < cube_max[2] and
-                    self.position[2] + self.player_radius > cube_min[2]):
-
-                # 检查是否站在方块顶部
-                if foot_y <= cube_max[1] and foot_y >= cube_max[1] - 0.5:
-                    return cube_max[1]
+        # 检查玩家是否在方块的X,Z范围内
+        inside = ((self.position[0] - self.player_radius < cubes[:, 0] + 1) &
+                  (self.position[0] + self.player_radius > cubes[:, 0] - 1) &
+                  (self.position[2] - self.player_radius < cubes[:, 2] + 1) &
+                  (self.position[2] + self.player_radius > cubes[:, 2] - 1))
+        # 检查是否站在方块顶部
+        top = cubes[:, 1] + 1
+        standing = inside & (foot_y <= top) & (foot_y >= top - 0.5)
+        if standing.any():
+            return float(top[np.argmax(standing)])  # 和原来一样取列表里第一个满足的方块
 
         # 检查是否在地面（Y=0）- 地面方块在Y=-1，所以顶部是Y=0
         if foot_y <= 0.1:
@@ -99,9 +93,13 @@ class Camera:
 
         return None
 
-    def jump(self):
-        """跳跃功能：每次跳跃后需等待 cooldown 时间"""
-        current_time = time.time()
+    def jump(self, current_time=None):
+        """跳跃功能：每次跳跃后需等待 cooldown 时间
+
+        current_time 默认取系统时间；联机模拟传入按输入序号算出的时间，保证服务器和客户端结果一致
+        """
+        if current_time is None:
+            current_time = time.time()
         if current_time - self.last_jump_time >= self.jump_cooldown:
             self.velocity_y = self.jump_strength
             self.last_jump_time = current_time
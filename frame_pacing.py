@@ -0,0 +1,81 @@
+## 帧时间控制器
+# 统计最近的帧耗时，超出预算时降低内部渲染分辨率和 LOD 距离，留有余量时再慢慢升回去。
+from collections import deque
+
+import numpy as np
+
+
+class FramePacer:
+    def __init__(self, target_frame_time=1.0 / 60,
+                 min_scale=0.5, max_scale=1.0, scale_step=0.1,
+                 min_lod=24.0, max_lod=100.0, lod_step=0.85,
+                 window=120, decide_every=30, headroom=0.75):
+        self.target_frame_time = target_frame_time  # 帧耗时预算（秒）
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.scale_step = scale_step
+        self.min_lod = min_lod
+        self.max_lod = max_lod
+        self.lod_step = lod_step  # 每次降级 LOD 距离乘这个系数
+        self.decide_every = decide_every  # 每多少帧做一次决策
+        self.headroom = headroom  # p99 低于预算的这个比例才升级
+
+        self.render_scale = max_scale
+        self.lod_distance = max_lod
+        self.frame_times = deque(maxlen=window)
+        self.frame_count = 0
+        self.calm_checks = 0  # 连续几次决策都有余量
+        self.decisions = []  # [(帧号, 动作, p99 毫秒, 分辨率比例, LOD 距离), ...]
+
+    def percentile(self, q):
+        """最近帧耗时的百分位数（秒）"""
+        if not self.frame_times:
+            return 0.0
+        return float(np.percentile(np.fromiter(self.frame_times, dtype=np.float64), q))
+
+    def frame(self, frame_time):
+        """记录一帧的耗时（秒），到了决策点就调整，返回本次的动作（"down"/"up"）或 None"""
+        self.frame_times.append(frame_time)
+        self.frame_count += 1
+        if self.frame_count % self.decide_every or len(self.frame_times) < self.decide_every:
+            return None
+
+        p99 = self.percentile(99)
+        action = None
+        if p99 > self.target_frame_time:
+            self.calm_checks = 0
+            # 超预算：先降分辨率（像素开销），同时收近 LOD 距离（顶点和绘制开销）
+            if self.render_scale > self.min_scale or self.lod_distance > self.min_lod:
+                self.render_scale = max(self.min_scale, round(self.render_scale - self.scale_step, 2))
+                self.lod_distance = max(self.min_lod, self.lod_distance * self.lod_step)
+                action = "down"
+        elif p99 < self.target_frame_time * self.headroom:
+            self.calm_checks += 1
+            # 连续两次都有余量才升级，避免在两档之间来回跳
+            if self.calm_checks >= 2 and (self.render_scale < self.max_scale or
+                                          self.lod_distance < self.max_lod):
+                self.render_scale = min(self.max_scale, round(self.render_scale + self.scale_step, 2))
+                self.lod_distance = min(self.max_lod, self.lod_distance / self.lod_step)
+                self.calm_checks = 0
+                action = "up"
+        else:
+            self.calm_checks = 0
+
+        if action is not None:
+            self.decisions.append((self.frame_count, action, p99 * 1e3, self.render_scale, self.lod_distance))
+            # 旧档位的耗时不再代表现在，清空重新统计
+            self.frame_times.clear()
+        return action
+
+    def stats(self, width, height):
+        """给统计输出用的字典，width/height 是窗口大小"""
+        return {
+            "frame": self.frame_count,
+            "p50_ms": round(self.percentile(50) * 1e3, 2),
+            "p99_ms": round(self.percentile(99) * 1e3, 2),
+            "budget_ms": round(self.target_frame_time * 1e3, 2),
+            "scale": self.render_scale,
+            "resolution": [int(width * self.render_scale), int(height * self.render_scale)],
+            "lod_distance": round(self.lod_distance, 1),
+            "decisions": len(self.decisions),
+        }
@@ -0,0 +1,104 @@
+## 关卡数据磁盘缓存
+# 迷宫的网格顶点按世界内容哈希缓存到磁盘，
+# 第二次启动同一个迷宫时直接读文件，跳过网格构建。
+# 只缓存网格：键是格子网格的哈希，所以迷宫生成（1024 个房间约 70 ms）每次启动还是要跑。
+# 缓存只是加速，读不了就重建、写不了就跳过；旧版本的文件和超出总大小上限的最久没用的文件会被删掉。
+import hashlib
+import os
+
+import numpy as np
+
+from maze_mesh import MazeMesh, build_maze_mesh
+
+# 网格格式或构建算法变了就加一，旧缓存自动失效（文件名带版本号，写新文件时删掉）
+CACHE_VERSION = 4
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".level_cache")
+# 缓存目录总大小上限；顶点不压缩存（压缩后小 10 倍，但 512 个房间的迷宫首次写入要多花约 9 s）
+CACHE_MAX_BYTES = 2 << 30
+
+
+def level_hash(world, uv_rects):
+    """迷宫内容哈希：格子网格（含入口出口）、几何尺寸和图集 uv 都参与计算"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.array([CACHE_VERSION, *world.shape], dtype=np.int64).tobytes())
+    h.update(np.array([world.cell_size, world.floor_y, world.wall_top], dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(uv_rects, dtype=np.float32).tobytes())
+    h.update(world.cells.tobytes())
+    return h.hexdigest()
+
+
+def cache_path(cache_dir, world, uv_rects):
+    return os.path.join(cache_dir, f"v{CACHE_VERSION}-{level_hash(world, uv_rects)}.npz")
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def prune_cache(cache_dir, incoming=0, max_bytes=CACHE_MAX_BYTES):
+    """删掉其他版本的缓存和残留的临时文件，再按最近使用时间从旧到新删，直到加上 incoming 字节不超过上限"""
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    current = []
+    for name in names:
+        if not name.endswith(".npz"):
+            continue
+        path = os.path.join(cache_dir, name)
+        if not name.startswith(f"v{CACHE_VERSION}-") or name.endswith(".tmp.npz"):
+            _remove(path)
+            continue
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        current.append((st.st_mtime, st.st_size, path))
+
+    total = incoming + sum(size for _, size, _ in current)
+    for _, size, path in sorted(current):
+        if total <= max_bytes:
+            break
+        _remove(path)
+        total -= size
+
+
+def load_or_build_level(world, uv_rects, cache_dir=CACHE_DIR):
+    """读取或构建关卡网格，返回 (MazeMesh, 是否命中缓存)
+
+    cache_dir 为 None 时不使用缓存。
+    """
+    path = None
+    if cache_dir is not None:
+        path = cache_path(cache_dir, world, uv_rects)
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    mesh = MazeMesh(data["vertices"], data["vertex_ranges"], data["chunk_bounds"])
+                try:
+                    os.utime(path)  # 命中的文件算最近用过，超出上限时最后才删
+                except OSError:
+                    pass
+                return mesh, True
+            except Exception:
+                # 截断的文件是 BadZipFile，空文件是 EOFError……读不出来就删掉重新构建
+                _remove(path)
+
+    mesh = build_maze_mesh(world.cells, uv_rects, world.cell_size, world.floor_y, world.wall_top)
+
+    size = mesh.vertices.nbytes + mesh.vertex_ranges.nbytes + mesh.chunk_bounds.nbytes
+    if path is not None and size <= CACHE_MAX_BYTES:
+        # 先写临时文件再改名，避免中途退出留下半个文件；目录只读、磁盘满时不缓存，照样返回网格
+        tmp_path = path[:-len(".npz")] + ".tmp.npz"
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            prune_cache(cache_dir, incoming=size)
+            np.savez(tmp_path, vertices=mesh.vertices, vertex_ranges=mesh.vertex_ranges,
+                     chunk_bounds=mesh.chunk_bounds)
+            os.replace(tmp_path, path)
+        except OSError:
+            _remove(tmp_path)
+    return mesh, False
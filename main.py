@@ -1,135 +1,96 @@
+import time
+_boot_start = time.perf_counter()
+
+import argparse
+import json
+import os
+
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
-from OpenGL.GLU import *
 
 import numpy as np
+from boot_timer import BootTimer
 from cube_data import vertices, indices
 from matrix_utils import get_projection_matrix
 from camera import Camera
-
-# 初始化窗口
-pygame.init()
+from maze_data import maze_layout, generate_maze, ENTRANCE, EXIT
+from world import World
+from materials import build_atlas
+from level_cache import load_or_build_level, CACHE_DIR
+from maze_renderer import MazeRenderer
+from raycast import raycast
+from frame_pacing import FramePacer
+from minimap import Minimap, minimap_supported
+from multiview import MultiViewRenderer, View, look_at, split_viewports
+from render_target import RenderTarget, framebuffers_supported
+
+# 窗口大小
 width, height = 800, 600
-pygame.display.set_mode((width, height), DOUBLEBUF | OPENGL)
-pygame.display.set_caption("3D 第一人称场景 - 重力碰撞版")
-
-# OpenGL 设置
-glEnable(GL_DEPTH_TEST)
-glClearColor(0.1, 0.1, 0.1, 1.0)
-
-# 投影矩阵
-fov = 90  # 减小FOV让视野更自然
-aspect_ratio = width / height
-projection = get_projection_matrix(fov, aspect_ratio, 0.1, 100.0)
-
-# 摄像机 - 修正出生位置，确保在地面上方正确高度
-camera = Camera(position=np.array([2, 2, 2], dtype=np.float32))  # 调整为合适的出生位置和高度
-clock = pygame.time.Clock()
-
-# 鼠标设置
-pygame.mouse.set_visible(False)
-pygame.event.set_grab(True)
-
-# 按键状态
-key_state = {
-    "W": False,
-    "S": False,
-    "A": False,
-    "D": False,
-    "SPACE": False
-}
-
-
-# 创建8x8的迷宫 - 减少内存占用
-def create_maze():
-    maze_positions = []
-
-    # 迷宫设计 - 8x8的网格，使用1和0表示墙和路
-    # 1 = 墙壁, 0 = 通路
-    maze_layout = [
-        [1, 1, 1, 1, 1, 1, 1, 1],
-        [1, 0, 1, 0, 0, 0, 0, 1],
-        [1, 0, 1, 0, 1, 1, 0, 1],
-        [1, 0, 0, 0, 0, 1, 0, 1],
-        [1, 1, 1, 1, 0, 1, 0, 1],
-        [1, 0, 0, 0, 0, 0, 0, 1],
-        [1, 0, 1, 1, 1, 1, 0, 1],
-        [1, 1, 1, 1, 1, 1, 1, 1],
-    ]
-
-    # 地面 - 填充整个区域，每个方块紧贴放置
-    for x in range(8):
-        for z in range(8):
-            maze_positions.append(np.array([x * 2, -1, z * 2], dtype=np.float32))  # 间距改为2
-
-    # 根据迷宫布局创建墙壁 - 墙壁下移到地面上
-    for z in range(8):
-        for x in range(8):
-            if maze_layout[z][x] == 1:  # 如果是墙
-                # 墙壁从地面开始，高度为2个单位，墙壁现在在 y=1 和 y=3（原来是y=1和y=3，现在改为y=0和y=2）
-                maze_positions.append(np.array([x * 2, 0, z * 2], dtype=np.float32))  # 下移1个单位
-                maze_positions.append(np.array([x * 2, 2, z * 2], dtype=np.float32))  # 下移1个单位
-
-    return maze_positions
-
-
-cube_positions = create_maze()
-
-
-# ---- 绘图函数 ----
-def draw_filled_cube(offset=np.array([0, 0, 0]), color=(1.0, 1.0, 1.0)):
-    """绘制填充的立方体"""
-    # 立方体的6个面
-    faces = [
-        # 前面
-        [0, 1, 3, 2],
-        # 后面
-        [4, 6, 7, 5],
-        # 左面
-        [0, 2, 6, 4],
-        # 右面
-        [1, 5, 7, 3],
-        # 上面
-        [2, 3, 7, 6],
-        # 下面
-        [0, 4, 5, 1]
-    ]
-
-    glColor3f(*color)
-
-    # 绘制填充的面
-    for face in faces:
-        glBegin(GL_QUADS)
-        for vertex_index in face:
-            v = vertices[vertex_index][:3] + offset
-            glVertex3fv(v)
-        glEnd()
-
-    # 绘制更清晰的边框线条
-    glLineWidth(2.0)  # 增加线条宽度
-    glColor3f(0.0, 0.0, 0.0)  # 黑色边框
-    glBegin(GL_LINES)
-    for edge in indices:
-        for vertex in edge:
-            v = vertices[vertex][:3] + offset
-            glVertex3fv(v)
-    glEnd()
-    glLineWidth(1.0)  # 恢复默认线条宽度
 
+# 准星能"够到"的距离，超过这个距离的目标不高亮
+reach_distance = 6.0
+
+
+def parse_args():
+    # 命令行参数：--connect host:port 时连接服务器（python net_server.py），本地只做预测和渲染
+    parser = argparse.ArgumentParser(description="3D 迷宫")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="连接到权威服务器")
+    parser.add_argument("--maze-size", type=int, metavar="N", help="随机生成 N x N 个房间的迷宫")
+    parser.add_argument("--seed", type=int, default=0, help="随机迷宫的种子")
+    parser.add_argument("--no-cache", action="store_true", help="不读写关卡缓存")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="关卡缓存目录（默认 .level_cache/）")
+    parser.add_argument("--boot-benchmark", action="store_true", help="画完第一帧就退出，只输出启动耗时")
+    parser.add_argument("--no-minimap", action="store_true", help="不显示小地图（游戏中按 M 切换）")
+    parser.add_argument("--views", type=int, default=1, choices=range(1, 17), metavar="N",
+                        help="分屏画 N 个视图：玩家 + N-1 个观战视角（联机时跟随其他玩家）")
+    parser.add_argument("--target-fps", type=float, default=60, help="帧率目标，决定每帧耗时预算")
+    parser.add_argument("--uncapped", action="store_true", help="不限制帧率")
+    parser.add_argument("--no-vsync", action="store_true", help="关闭垂直同步")
+    parser.add_argument("--fixed-resolution", action="store_true", help="关闭自适应分辨率和 LOD")
+    parser.add_argument("--stats", action="store_true", help="每秒输出一次帧时间统计和控制器决策")
+    parser.add_argument("--stats-file", metavar="PATH", help="统计同时按 JSON 行写入文件")
+    parser.add_argument("--benchmark", type=int, metavar="FRAMES",
+                        help="不限帧率跑 FRAMES 帧（视角自动转动），输出汇总后退出")
+    args = parser.parse_args()
+    if args.benchmark:
+        args.uncapped = True
+    if args.connect and args.maze_size:
+        parser.error("联机时使用服务器的迷宫，不能同时指定 --maze-size")
+    return args
+
+
+def load_level(args):
+    """返回关卡的 World"""
+    if args.maze_size:
+        return World.from_layout(*generate_maze(args.maze_size, args.maze_size, args.seed))
+    return World.from_layout(maze_layout, ENTRANCE, EXIT)
+
+
+def init_window(vsync=True):
+    # 初始化窗口
+    if not vsync:
+        # Mesa / NVIDIA 驱动通过环境变量关闭交换间隔，必须在创建窗口之前设置
+        os.environ.setdefault("vblank_mode", "0")
+        os.environ.setdefault("__GL_SYNC_TO_VBLANK", "0")
+    pygame.init()
+    try:
+        pygame.display.set_mode((width, height), DOUBLEBUF | OPENGL, vsync=1 if vsync else 0)
+    except pygame.error:
+        # 驱动不支持指定垂直同步时退回默认设置
+        pygame.display.set_mode((width, height), DOUBLEBUF | OPENGL)
+    pygame.display.set_caption("3D 第一人称场景 - 重力碰撞版")
+
+    # OpenGL 设置
+    glEnable(GL_DEPTH_TEST)
+    glClearColor(0.1, 0.1, 0.1, 1.0)
 
-def draw_ground_cube(offset=np.array([0, 0, 0]), color=(1.0, 1.0, 1.0)):
-    """只绘制地面方块的底面，上移一个格子"""
-    # 只绘制底面 [0, 4, 5, 1]，但上移一个格子
-    glColor3f(*color)
-    glBegin(GL_QUADS)
-    for vertex_index in [0, 4, 5, 1]:  # 底面的顶点索引
-        v = vertices[vertex_index][:3] + offset
-        v[1] += 1  # 上移一个格子（每个格子高度为2）
-        glVertex3fv(v)
-    glEnd()
+    # 鼠标设置
+    pygame.mouse.set_visible(False)
+    pygame.event.set_grab(True)
 
 
+# ---- 绘图函数 ----
 def draw_cube_wireframe(offset=np.array([0, 0, 0]), color=(1.0, 1.0, 1.0)):
     """绘制线框立方体（用于地面）"""
     glLineWidth(2.0)  # 增加线条宽度
@@ -154,8 +115,12 @@ def draw_grid(size=20, step=2):  # 调整网格以匹配新的方块间距
     glEnd()
 
 
-def draw_crosshair():
-    """绘制准星"""
+def draw_crosshair(target=None, minimap=None, camera=None, center=None):
+    """绘制准星，瞄准范围内有墙时变色；给出 minimap 时在同一个正交投影里画小地图
+
+    center 是准星在窗口里的位置，默认窗口中心（分屏时是玩家视图的中心）。
+    """
+    cx, cy = center if center is not None else (width / 2, height / 2)
     # 保存当前矩阵
     glMatrixMode(GL_PROJECTION)
     glPushMatrix()
@@ -169,18 +134,24 @@ def draw_crosshair():
     # 禁用深度测试以确保准星在最前面
     glDisable(GL_DEPTH_TEST)
 
-    glColor3f(1.0, 1.0, 1.0)
+    if target is not None and target.solid and target.distance <= reach_distance:
+        glColor3f(1.0, 0.8, 0.2)  # 黄色 - 正对着墙
+    else:
+        glColor3f(1.0, 1.0, 1.0)
     glLineWidth(2.0)  # 增加准星线条宽度
     glBegin(GL_LINES)
     # 水平线
-    glVertex2f(width / 2 - 10, height / 2)
-    glVertex2f(width / 2 + 10, height / 2)
+    glVertex2f(cx - 10, cy)
+    glVertex2f(cx + 10, cy)
     # 垂直线
-    glVertex2f(width / 2, height / 2 - 10)
-    glVertex2f(width / 2, height / 2 + 10)
+    glVertex2f(cx, cy - 10)
+    glVertex2f(cx, cy + 10)
     glEnd()
     glLineWidth(1.0)  # 恢复默认线条宽度
 
+    if minimap is not None:
+        minimap.draw(camera.position, camera.yaw, width, height)
+
     # 恢复深度测试
     glEnable(GL_DEPTH_TEST)
 
@@ -191,98 +162,292 @@ def draw_crosshair():
     glMatrixMode(GL_MODELVIEW)
 
 
-# ---- 主循环 ----
-running = True
-while running:
-    delta_time = clock.tick(60) / 1000.0
-
-    # 事件处理
-    for event in pygame.event.get():
-        if event.type == QUIT:
+def emit_stats(args, record):
+    """输出一条统计（--stats 打印到终端，--stats-file 追加 JSON 行）"""
+    if args.stats:
+        print(json.dumps(record, ensure_ascii=False))
+    if args.stats_file:
+        with open(args.stats_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+# ---- 主程序 ----
+def main():
+    boot = BootTimer(_boot_start)
+    boot.mark("imports", _boot_start)
+    args = parse_args()
+
+    with boot.phase("window"):
+        init_window(vsync=not args.no_vsync)
+
+    # 世界格子网格给射线查询、碰撞和渲染共用；网格顶点按内容哈希缓存在磁盘上（迷宫生成本身不缓存，每次都跑）
+    with boot.phase("level"):
+        world = load_level(args)
+        atlas, uv_rects = build_atlas()
+        mesh, cache_hit = load_or_build_level(world, uv_rects, cache_dir=None if args.no_cache else args.cache_dir)
+
+    with boot.phase("upload"):
+        maze_renderer = MazeRenderer(mesh, atlas)
+        # 自适应分辨率需要离屏渲染目标，驱动不支持时只调 LOD 距离
+        render_target = RenderTarget(width, height) if framebuffers_supported() else None
+        # 小地图是整个迷宫的一张纹理：--no-minimap 时先不建（按 M 再建），迷宫太大放不进纹理就不显示
+        minimap_allowed = minimap_supported(world)
+        if not minimap_allowed:
+            print(f"迷宫 {world.shape[1]}x{world.shape[0]} 超过 GL_MAX_TEXTURE_SIZE，不显示小地图")
+        minimap = Minimap(world) if minimap_allowed and not args.no_minimap else None
+
+    # 帧时间控制器：p99 帧耗时超出预算就降内部分辨率和 LOD 距离
+    pacer = FramePacer(target_frame_time=1.0 / args.target_fps)
+    if args.fixed_resolution:
+        pacer.min_scale = pacer.max_scale
+        pacer.min_lod = pacer.max_lod
+    if render_target is None:
+        pacer.min_scale = pacer.max_scale
+    frame_cap = 0 if args.uncapped else args.target_fps
+    all_frame_times = []
+    last_stats_time = time.perf_counter()
+
+    # 投影矩阵
+    fov = 90  # 减小FOV让视野更自然
+    aspect_ratio = width / height
+    projection = get_projection_matrix(fov, aspect_ratio, 0.1, 100.0)
+
+    # 摄像机 - 出生在入口格子上方，确保在地面上方正确高度
+    camera = Camera(position=world.spawn_position())
+    clock = pygame.time.Clock()
+
+    # 按键状态
+    key_state = {
+        "W": False,
+        "S": False,
+        "A": False,
+        "D": False,
+        "SPACE": False
+    }
+
+    # 联机模式：摄像机由客户端预测/服务器校正，asyncio 事件循环每帧在主循环里推进一次
+    net_client = None
+    if args.connect:
+        # 只有联机时才需要这些模块
+        import asyncio
+        import netcode
+        from net_client import GameClient
+
+        host, port = args.connect.rsplit(":", 1)
+        net_loop = asyncio.new_event_loop()
+        net_client = GameClient()
+        net_loop.run_until_complete(net_client.connect(host, int(port)))
+        net_receiver = net_loop.create_task(net_client.receive_loop())
+        net_client.camera.yaw, net_client.camera.pitch = camera.yaw, camera.pitch
+        camera = net_client.camera
+        net_accumulator = 0.0
+        jump_requested = False
+
+    # 分屏：玩家视图在左上角，其余是观战视角，所有视图一起剔除、共用迷宫的 VBO
+    multiview = None
+    if args.views > 1:
+        multiview = MultiViewRenderer(maze_renderer)
+        viewports = split_viewports(args.views, width, height)
+        views = [View(camera, viewports[0])]
+        views += [View(Camera(position=world.spawn_position()), viewport) for viewport in viewports[1:]]
+        player_view = viewports[0]
+        pacer.min_scale = pacer.max_scale  # 分屏时不用整窗口的离屏缩放，只调 LOD 距离
+
+    def draw_players(view):
+        """画其他玩家（线框方块）；观战视图里也画出本地玩家"""
+        if net_client is not None:
+            for state in net_client.remote_players.values():
+                position = np.array(state[:3], dtype=np.float32) / netcode.POSITION_SCALE
+                draw_cube_wireframe(position, (1.0, 0.8, 0.2))
+        if view is not None and view.camera is not camera:
+            draw_cube_wireframe(camera.position, (0.2, 1.0, 0.4))
+
+    first_frame = True
+    running = True
+    while running:
+        delta_time = clock.tick(frame_cap) / 1000.0
+        frame_start = time.perf_counter()
+
+        # 事件处理
+        for event in pygame.event.get():
+            if event.type == QUIT:
+                running = False
+            elif event.type == KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                if event.key == pygame.K_m and minimap_allowed:
+                    if minimap is None:
+                        minimap = Minimap(world)
+                    else:
+                        minimap.visible = not minimap.visible
+                if event.key == pygame.K_w:
+                    key_state["W"] = True
+                if event.key == pygame.K_s:
+                    key_state["S"] = True
+                if event.key == pygame.K_a:
+                    key_state["A"] = True
+                if event.key == pygame.K_d:
+                    key_state["D"] = True
+                if event.key == pygame.K_SPACE:
+                    if net_client is not None:
+                        jump_requested = True  # 联机时跳跃随下一条输入发给服务器
+                    else:
+                        camera.jump()  # ✅ 直接调用跳跃，只触发一次
+            elif event.type == KEYUP:
+                if event.key == pygame.K_w:
+                    key_state["W"] = False
+                if event.key == pygame.K_s:
+                    key_state["S"] = False
+                if event.key == pygame.K_a:
+                    key_state["A"] = False
+                if event.key == pygame.K_d:
+                    key_state["D"] = False
+
+
+        # 鼠标移动
+        x_offset, y_offset = pygame.mouse.get_rel()
+        if args.benchmark:
+            x_offset, y_offset = 5, 0  # 基准模式下匀速转动视角
+        camera.process_mouse_movement(x_offset, -y_offset)
+
+        if net_client is not None:
+            # 按服务器的固定步长生成输入，本地立即预测
+            net_accumulator += delta_time
+            buttons = 0
+            for key, bit in (("W", netcode.BUTTON_FORWARD), ("S", netcode.BUTTON_BACKWARD),
+                             ("A", netcode.BUTTON_LEFT), ("D", netcode.BUTTON_RIGHT)):
+                if key_state[key]:
+                    buttons |= bit
+            while net_accumulator >= 1.0 / net_client.tick_rate:
+                net_accumulator -= 1.0 / net_client.tick_rate
+                net_client.send_input(buttons | (netcode.BUTTON_JUMP if jump_requested else 0))
+                jump_requested = False
+            net_loop.run_until_complete(asyncio.sleep(0))  # 收发网络消息
+            if net_receiver.done():
+                running = False
+        else:
+            # 键盘移动（现在包含碰撞检测），只取玩家周围的方块
+            cubes = world.cubes_around(camera.position)
+            any_key_pressed = False
+            if key_state["W"]:
+                camera.process_keyboard("FORWARD", delta_time, cubes)
+                any_key_pressed = True
+            if key_state["S"]:
+                camera.process_keyboard("BACKWARD", delta_time, cubes)
+                any_key_pressed = True
+            if key_state["A"]:
+                camera.process_keyboard("LEFT", delta_time, cubes)
+                any_key_pressed = True
+            if key_state["D"]:
+                camera.process_keyboard("RIGHT", delta_time, cubes)
+                any_key_pressed = True
+            if key_state["SPACE"]:
+                camera.jump()  # 添加跳跃功能
+
+            # 更新移动状态 - 只有在按键时才设为True
+            camera.is_moving = any_key_pressed
+
+            # 更新物理（重力）和头部摇晃
+            camera.update_physics(delta_time, cubes)
+        camera.update_head_bob(delta_time)
+
+        # 低于全分辨率时先画到离屏目标，再放大到窗口
+        offscreen = multiview is None and render_target is not None and pacer.render_scale < 1.0
+        if offscreen:
+            render_target.begin(pacer.render_scale)
+
+        if multiview is not None:
+            # 观战视角绕着跟随的目标转：联机时依次跟随其他玩家，否则都看着本地玩家
+            remote = []
+            if net_client is not None:
+                remote = [np.array(state[:3], dtype=np.float32) / netcode.POSITION_SCALE
+                          for state in net_client.remote_players.values()]
+            orbit_time = time.perf_counter() * 0.2
+            for i, view in enumerate(views[1:]):
+                followed = remote[i] if i < len(remote) else camera.position
+                angle = orbit_time + 2 * np.pi * i / (len(views) - 1)
+                eye = followed + np.array([np.cos(angle) * 6.0, 6.0, np.sin(angle) * 6.0], dtype=np.float32)
+                look_at(view.camera, eye, followed)
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            multiview.lod_distance = pacer.lod_distance
+            multiview.draw(views, (width, height), extra=draw_players)
+            maze_renderer.drawn_chunks = views[0].drawn_chunks
+        else:
+            # 清屏
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+
+            # 视图矩阵设置
+            glMatrixMode(GL_MODELVIEW)
+            glLoadIdentity()
+            mvp = projection @ camera.get_view_matrix()
+            glMultMatrixf(mvp.T)
+
+            # 绘制内容
+            # draw_grid()  # 注释掉网格线，地面不要有线条
+
+            # 绘制所有方块 - 一个材质批次，只画 LOD 距离内的块
+            maze_renderer.draw(camera.position, pacer.lod_distance)
+
+            # 其他玩家用线框方块表示
+            draw_players(None)
+
+        if offscreen:
+            render_target.end()
+
+        # 绘制准星 - 查询视线正对的格子
+        target = raycast(world.cells, camera.position, camera.front)
+        if minimap is not None:
+            minimap.update(camera.position)
+        if multiview is not None:
+            x, y, w, h = player_view
+            draw_crosshair(target, minimap, camera, center=(x + w / 2, y + h / 2))
+        else:
+            draw_crosshair(target, minimap, camera)
+
+        # 帧耗时不含 clock.tick 的等待，也不含 flip 等垂直同步的时间（在交换缓冲区之前取，
+        # glFinish 只等 GPU 画完）；否则开着垂直同步时每帧都量成刷新间隔，控制器会一直降级升不回来
+        glFinish()
+        frame_time = time.perf_counter() - frame_start
+        pygame.display.flip()
+
+        all_frame_times.append(frame_time)
+        decision = pacer.frame(frame_time)
+        if decision is not None:
+            frame_index, action, p99_ms, scale, lod = pacer.decisions[-1]
+            emit_stats(args, {"event": "decision", "frame": frame_index, "action": action,
+                              "p99_ms": round(p99_ms, 2), "scale": scale, "lod_distance": round(lod, 1)})
+        if (args.stats or args.stats_file) and time.perf_counter() - last_stats_time >= 1.0:
+            last_stats_time = time.perf_counter()
+            record = pacer.stats(width, height)
+            record.update(event="stats", fps=round(clock.get_fps(), 1), drawn_chunks=maze_renderer.drawn_chunks)
+            emit_stats(args, record)
+        if args.benchmark and len(all_frame_times) >= args.benchmark:
             running = False
-        elif event.type == KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
+
+        if first_frame:
+            first_frame = False
+            print(boot.report() + ("（关卡缓存命中）" if cache_hit else ""))
+            if args.boot_benchmark:
                 running = False
-            if event.key == pygame.K_w:
-                key_state["W"] = True
-            if event.key == pygame.K_s:
-                key_state["S"] = True
-            if event.key == pygame.K_a:
-                key_state["A"] = True
-            if event.key == pygame.K_d:
-                key_state["D"] = True
-            if event.key == pygame.K_SPACE:
-                camera.jump()  # ✅ 直接调用跳跃，只触发一次
-        elif event.type == KEYUP:
-            if event.key == pygame.K_w:
-                key_state["W"] = False
-            if event.key == pygame.K_s:
-                key_state["S"] = False
-            if event.key == pygame.K_a:
-                key_state["A"] = False
-            if event.key == pygame.K_d:
-                key_state["D"] = False
-
-
-    # 鼠标移动
-    x_offset, y_offset = pygame.mouse.get_rel()
-    camera.process_mouse_movement(x_offset, -y_offset)
-
-    # 键盘移动（现在包含碰撞检测）
-    any_key_pressed = False
-    if key_state["W"]:
-        camera.process_keyboard("FORWARD", delta_time, cube_positions)
-        any_key_pressed = True
-    if key_state["S"]:
-        camera.process_keyboard("BACKWARD", delta_time, cube_positions)
-        any_key_pressed = True
-    if key_state["A"]:
-        camera.process_keyboard("LEFT", delta_time, cube_positions)
-        any_key_pressed = True
-    if key_state["D"]:
-        camera.process_keyboard("RIGHT", delta_time, cube_positions)
-        any_key_pressed = True
-    if key_state["SPACE"]:
-        camera.jump()  # 添加跳跃功能
-
-    # 更新移动状态 - 只有在按键时才设为True
-    camera.is_moving = any_key_pressed
-
-    # 更新物理（重力）和头部摇晃
-    camera.update_physics(delta_time, cube_positions)
-    camera.update_head_bob(delta_time)
-
-    # 清屏
-    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-
-    # 视图矩阵设置
-    glMatrixMode(GL_MODELVIEW)
-    glLoadIdentity()
-    mvp = projection @ camera.get_view_matrix()
-    glMultMatrixf(mvp.T)
-
-    # 绘制内容
-    # draw_grid()  # 注释掉网格线，地面不要有线条
-
-    # 绘制所有方块
-    for i, pos in enumerate(cube_positions):
-        if pos[1] <= -1:  # 地面方块 - 只渲染底面
-            color = (0.4, 0.3, 0.2)  # 棕色地面
-            draw_ground_cube(pos, color)
-        else:  # 墙壁方块 - 用填充
-            # 入口区域标记
-            if pos[0] == 2 and pos[2] == 2:  # 调整入口位置
-                color = (0.2, 0.8, 0.2)  # 亮绿色 - 入口
-            # 出口区域标记 - 调整为8x8迷宫的出口位置
-            elif pos[0] == 12 and pos[2] == 12:  # 调整出口位置(6*2=12)
-                color = (0.8, 0.2, 0.2)  # 红色 - 出口
-            else:
-                color = (0.6, 0.6, 0.8)  # 蓝灰色 - 普通墙壁
-            draw_filled_cube(pos, color)
-
-    # 绘制准星
-    draw_crosshair()
-
-    pygame.display.flip()
-
-pygame.quit()
\ No newline at end of file
+
+    if args.benchmark:
+        times = np.asarray(all_frame_times) * 1e3
+        summary = pacer.stats(width, height)
+        summary.update(event="benchmark", frames=len(times),
+                       p50_ms=round(float(np.percentile(times, 50)), 2),
+                       p99_ms=round(float(np.percentile(times, 99)), 2),
+                       mean_ms=round(float(times.mean()), 2))
+        # 汇总一定要打印（bench_frame 读它），--stats 时 emit_stats 已经打印过
+        emit_stats(args, summary)
+        if not args.stats:
+            print(json.dumps(summary, ensure_ascii=False))
+
+    if net_client is not None:
+        net_client.close()
+        net_loop.run_until_complete(net_receiver)
+        net_loop.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+## 材质和纹理图集
+# 所有材质的纹理程序化生成后打包进一张图集，整个迷宫只需要绑定一次纹理。
+import numpy as np
+
+# 材质编号（每个格子一个，和 world 的格子代码相同，World.cells 直接当材质网格用）
+MATERIAL_FLOOR = 0
+MATERIAL_WALL = 1
+MATERIAL_ENTRANCE = 2
+MATERIAL_EXIT = 3
+MATERIAL_COUNT = 4
+
+# 图集里每个材质占一个 64x64 的槽，中间 48x48 是纹理，四周各 8 像素复制边缘，
+# 这样前 3 级 mipmap 不会把相邻材质的颜色混进来
+TILE_SIZE = 48
+TILE_PADDING = 8
+SLOT_SIZE = TILE_SIZE + TILE_PADDING * 2
+ATLAS_COLUMNS = 2
+MAX_MIP_LEVEL = 3
+
+
+def _noise(rng, strength):
+    return rng.uniform(-strength, strength, (TILE_SIZE, TILE_SIZE, 1))
+
+
+def _wall_tile(rng):
+    """蓝灰色砖墙"""
+    tile = np.empty((TILE_SIZE, TILE_SIZE, 3))
+    tile[:] = (0.6, 0.6, 0.8)
+    tile += _noise(rng, 0.05)
+    y, x = np.mgrid[0:TILE_SIZE, 0:TILE_SIZE]
+    row = y // 12
+    mortar = (y % 12 == 0) | ((x + (row % 2) * 12) % 24 == 0)
+    tile[mortar] = (0.3, 0.3, 0.4)
+    return tile
+
+
+def _floor_tile(rng, color):
+    """带深色描边的地砖"""
+    tile = np.empty((TILE_SIZE, TILE_SIZE, 3))
+    tile[:] = color
+    tile += _noise(rng, 0.04)
+    edge = np.zeros((TILE_SIZE, TILE_SIZE), dtype=bool)
+    edge[:2, :] = edge[-2:, :] = edge[:, :2] = edge[:, -2:] = True
+    tile[edge] *= 0.6
+    return tile
+
+
+def build_atlas(seed=0):
+    """生成纹理图集，返回 (RGBA uint8 图像, 每个材质的 uv 矩形 (u0, v0, u1, v1))"""
+    rng = np.random.default_rng(seed)
+    tiles = [None] * MATERIAL_COUNT
+    tiles[MATERIAL_FLOOR] = _floor_tile(rng, (0.4, 0.3, 0.2))  # 棕色地面
+    tiles[MATERIAL_WALL] = _wall_tile(rng)
+    tiles[MATERIAL_ENTRANCE] = _floor_tile(rng, (0.2, 0.8, 0.2))  # 亮绿色 - 入口
+    tiles[MATERIAL_EXIT] = _floor_tile(rng, (0.8, 0.2, 0.2))  # 红色 - 出口
+
+    rows = -(-MATERIAL_COUNT // ATLAS_COLUMNS)
+    size = SLOT_SIZE * ATLAS_COLUMNS, SLOT_SIZE * rows
+    atlas = np.zeros((size[1], size[0], 4), dtype=np.uint8)
+    uv_rects = np.zeros((MATERIAL_COUNT, 4), dtype=np.float32)
+
+    for material, tile in enumerate(tiles):
+        rgb = (np.clip(tile, 0.0, 1.0) * 255).astype(np.uint8)
+        rgba = np.concatenate([rgb, np.full((TILE_SIZE, TILE_SIZE, 1), 255, np.uint8)], axis=2)
+        padded = np.pad(rgba, ((TILE_PADDING, TILE_PADDING), (TILE_PADDING, TILE_PADDING), (0, 0)),
+                        mode="edge")
+        sx = material % ATLAS_COLUMNS * SLOT_SIZE
+        sy = material // ATLAS_COLUMNS * SLOT_SIZE
+        atlas[sy:sy + SLOT_SIZE, sx:sx + SLOT_SIZE] = padded
+        uv_rects[material] = (
+            (sx + TILE_PADDING) / size[0],
+            (sy + TILE_PADDING) / size[1],
+            (sx + TILE_PADDING + TILE_SIZE) / size[0],
+            (sy + TILE_PADDING + TILE_SIZE) / size[1],
+        )
+    return atlas, uv_rects
+
+
+def build_mipmaps(image, max_level=MAX_MIP_LEVEL):
+    """用 2x2 平均逐级缩小，返回包含原图在内的各级图像列表"""
+    levels = [image]
+    for _ in range(max_level):
+        prev = levels[-1].astype(np.uint16)
+        h, w = prev.shape[0] // 2, prev.shape[1] // 2
+        if h == 0 or w == 0:
+            break
+        prev = prev[:h * 2, :w * 2]
+        level = (prev[0::2, 0::2] + prev[1::2, 0::2] + prev[0::2, 1::2] + prev[1::2, 1::2] + 2) // 4
+        levels.append(level.astype(np.uint8))
+    return levels
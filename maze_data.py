@@ -0,0 +1,73 @@
+## 迷宫布局和网格尺寸
+import numpy as np
+
+# 迷宫设计 - 8x8的网格，使用1和0表示墙和路
+# 1 = 墙壁, 0 = 通路，按 maze_layout[z][x] 索引
+maze_layout = [
+    [1, 1, 1, 1, 1, 1, 1, 1],
+    [1, 0, 1, 0, 0, 0, 0, 1],
+    [1, 0, 1, 0, 1, 1, 0, 1],
+    [1, 0, 0, 0, 0, 1, 0, 1],
+    [1, 1, 1, 1, 0, 1, 0, 1],
+    [1, 0, 0, 0, 0, 0, 0, 1],
+    [1, 0, 1, 1, 1, 1, 0, 1],
+    [1, 1, 1, 1, 1, 1, 1, 1],
+]
+
+# 每个格子边长2，格子(x, z)的中心在世界坐标 (x * 2, z * 2)
+CELL_SIZE = 2.0
+# 地面绘制高度（地面画在 y=-1，比碰撞用的地面顶部 y=0 低一格，射线拾取和网格都以看得见的地面为准）
+FLOOR_Y = -1.0
+# 墙顶高度（墙壁方块在 y=0 和 y=2，顶部是 y=3）
+WALL_TOP = 3.0
+
+# 入口和出口格子 (x, z)，对应世界坐标 (2, 2) 和 (12, 12)
+ENTRANCE = (1, 1)
+EXIT = (6, 6)
+
+
+# 创建8x8的迷宫 - 每个方块一个数组，大迷宫请用 world.World（每格 1 字节）
+def create_maze(layout=maze_layout):
+    maze_positions = []
+    rows, cols = len(layout), len(layout[0])
+
+    # 地面 - 填充整个区域，每个方块紧贴放置
+    for x in range(cols):
+        for z in range(rows):
+            maze_positions.append(np.array([x * 2, -1, z * 2], dtype=np.float32))  # 间距改为2
+
+    # 根据迷宫布局创建墙壁 - 墙壁下移到地面上
+    for z in range(rows):
+        for x in range(cols):
+            if layout[z][x] == 1:  # 如果是墙
+                # 墙壁从地面开始，高度为2个单位，墙壁在 y=0 和 y=2
+                maze_positions.append(np.array([x * 2, 0, z * 2], dtype=np.float32))
+                maze_positions.append(np.array([x * 2, 2, z * 2], dtype=np.float32))
+
+    return maze_positions
+
+
+def generate_maze(cells_x, cells_z, seed=0):
+    """用二叉树算法生成 cells_x * cells_z 个房间的迷宫（纯 numpy，大迷宫也很快）
+
+    返回 (layout, entrance, exit)：layout 是 (2 * cells_z + 1, 2 * cells_x + 1) 的 uint8 数组，
+    入口在左上角房间，出口在右下角房间。
+    """
+    rng = np.random.default_rng(seed)
+    layout = np.ones((2 * cells_z + 1, 2 * cells_x + 1), dtype=np.uint8)
+    layout[1::2, 1::2] = 0
+
+    # 每个房间打通北边或东边：第一行只能往东，最后一列只能往北
+    north = rng.random((cells_z, cells_x)) < 0.5
+    north[0, :] = False
+    north[:, -1] = True
+    north[0, -1] = False
+    east = ~north
+    east[:, -1] = False
+
+    zi, xi = np.nonzero(north)
+    layout[2 * zi, 2 * xi + 1] = 0
+    zi, xi = np.nonzero(east)
+    layout[2 * zi + 1, 2 * xi + 2] = 0
+
+    return layout, (1, 1), (2 * cells_x - 1, 2 * cells_z - 1)
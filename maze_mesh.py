@@ -0,0 +1,234 @@
+## 迷宫网格（顶点数据）构建
+# 一次性把所有墙面和地面生成到一个顶点数组里，渲染时一次绘制调用画完（可以按块跳过远处的部分）。
+# 光照（角落环境光遮蔽 + 方向光）在构建时烘焙成顶点颜色，运行时没有额外开销，也不再需要黑色边框线。
+import numpy as np
+
+from maze_data import CELL_SIZE, FLOOR_Y, WALL_TOP
+from materials import MATERIAL_WALL
+
+# 每个顶点: x, y, z, u, v, r, g, b
+VERTEX_SIZE = 8
+# 网格按 16x16 格子分块排列，每块的顶点连续存放，渲染时可以按距离只画一部分块
+CHUNK_CELLS = 16
+# 每块后面预留多少个四边形的空位，局部重新烘焙时新顶点放得下就原地写入，不用挪动整个数组
+CHUNK_SLACK = 16
+
+# 每种面的 4 个角（格子局部坐标，x/z 取 ±1 表示格子边界，y 取 0/1 表示底/顶），
+# 从面外侧看是逆时针
+_SIDE_FACES = {
+    # 名称: (邻居方向 dx, dz), 4 个角 (x, y, z)
+    "+x": ((1, 0), [(1, 0, 1), (1, 0, -1), (1, 1, -1), (1, 1, 1)]),
+    "-x": ((-1, 0), [(-1, 0, -1), (-1, 0, 1), (-1, 1, 1), (-1, 1, -1)]),
+    "+z": ((0, 1), [(-1, 0, 1), (1, 0, 1), (1, 1, 1), (-1, 1, 1)]),
+    "-z": ((0, -1), [(1, 0, -1), (-1, 0, -1), (-1, 1, -1), (1, 1, -1)]),
+}
+_TOP_FACE = [(-1, 0, 1), (1, 0, 1), (1, 0, -1), (-1, 0, -1)]
+# 每个角在材质贴图里的位置（0~1）
+_FACE_UV = [(0, 0), (1, 0), (1, 1), (0, 1)]
+
+# 光照参数：方向光从右上方照下来，背光面只剩环境光
+LIGHT_DIRECTION = np.array([0.5, 1.0, 0.3]) / np.linalg.norm([0.5, 1.0, 0.3])
+AMBIENT = 0.5
+# 遮蔽等级 0（两边都被挡住）~ 3（没有遮挡）对应的亮度
+AO_CURVE = np.array([0.55, 0.7, 0.85, 1.0], dtype=np.float32)
+
+
+class MazeMesh:
+    def __init__(self, vertices, vertex_ranges, chunk_bounds):
+        self.vertices = vertices  # (N, VERTEX_SIZE) float32，每 4 个顶点一个四边形，块之间有预留空位
+        self.vertex_ranges = vertex_ranges  # (块数, 2) int32，每块的 (起始顶点, 顶点数)
+        self.chunk_bounds = chunk_bounds  # (块数, 4) float32，每块的 (x_min, z_min, x_max, z_max)
+
+    @property
+    def quad_count(self):
+        return int(self.vertex_ranges[:, 1].sum()) // 4
+
+    def chunks_within(self, eye, distance):
+        """XZ 平面上离 eye 不超过 distance 的块，返回 bool 数组"""
+        b = self.chunk_bounds
+        dx = np.maximum(np.maximum(b[:, 0] - eye[0], eye[0] - b[:, 2]), 0)
+        dz = np.maximum(np.maximum(b[:, 1] - eye[2], eye[2] - b[:, 3]), 0)
+        return dx * dx + dz * dz <= distance * distance
+
+
+def _face_light(normal):
+    """方向光亮度（Lambert + 环境光）"""
+    return AMBIENT + (1 - AMBIENT) * max(float(np.dot(normal, LIGHT_DIRECTION)), 0.0)
+
+
+def _vertex_ao(side1, side2, corner):
+    """经典体素角落遮蔽：两边都挡住时最暗，否则按挡住的格子数，返回 AO_CURVE 里的亮度"""
+    level = 3 - (side1.astype(np.int8) + side2 + corner)
+    level[side1 & side2] = 0
+    return AO_CURVE[level]
+
+
+def _quads(cx, cz, corners, y0, y1, half, uv_rects, materials, shade):
+    """给一批格子生成同一种面的四边形，返回 (len(cx) * 4, VERTEX_SIZE)
+
+    shade 是每个角的亮度 (len(cx), 4)。
+    """
+    corners = np.asarray(corners, dtype=np.float32)
+    uv = np.asarray(_FACE_UV, dtype=np.float32)
+    n = len(cx)
+    out = np.empty((n, 4, VERTEX_SIZE), dtype=np.float32)
+    out[:, :, 0] = cx[:, None] + corners[None, :, 0] * half
+    out[:, :, 1] = y0 + corners[None, :, 1] * (y1 - y0)
+    out[:, :, 2] = cz[:, None] + corners[None, :, 2] * half
+    rect = uv_rects[materials]
+    out[:, :, 3] = rect[:, None, 0] + uv[None, :, 0] * (rect[:, None, 2] - rect[:, None, 0])
+    out[:, :, 4] = rect[:, None, 1] + uv[None, :, 1] * (rect[:, None, 3] - rect[:, None, 1])
+    out[:, :, 5:8] = shade[:, :, None]
+    # 四边形按 0-2 对角线拆成三角形，遮蔽不对称时换一条对角线，避免亮度插值出现折痕
+    flip = shade[:, 0] + shade[:, 2] < shade[:, 1] + shade[:, 3]
+    out[flip] = np.roll(out[flip], 1, axis=1)
+    return out.reshape(-1, VERTEX_SIZE)
+
+
+def _padded_walls(materials, x0, z0, x1, z1):
+    """[z0:z1, x0:x1] 窗口外扩一圈的墙壁网格，迷宫外算通路"""
+    rows, cols = materials.shape
+    out = np.zeros((z1 - z0 + 2, x1 - x0 + 2), dtype=bool)
+    sz0, sz1 = max(z0 - 1, 0), min(z1 + 1, rows)
+    sx0, sx1 = max(x0 - 1, 0), min(x1 + 1, cols)
+    out[sz0 - z0 + 1:sz1 - z0 + 1, sx0 - x0 + 1:sx1 - x0 + 1] = materials[sz0:sz1, sx0:sx1] == MATERIAL_WALL
+    return out
+
+
+def _bake_window(materials, uv_rects, x0, z0, x1, z1, cell_size, floor_y, wall_top):
+    """生成 [z0:z1, x0:x1] 窗口里所有格子的四边形（邻居和遮蔽看整个网格）
+
+    返回 (顶点, 每个四边形所在格子的 x, z)。
+    """
+    half = cell_size / 2
+    padded = _padded_walls(materials, x0, z0, x1, z1)
+    rows, cols = z1 - z0, x1 - x0
+    walls = padded[1:-1, 1:-1]
+    window = materials[z0:z1, x0:x1]
+
+    def wall_at(x, z, dx, dz):
+        # 窗口内格子 (x, z) 偏移 (dx, dz) 处是不是墙，dx/dz 可以是每个角不同的数组
+        return padded[z + 1 + dz, x + 1 + dx]
+
+    parts = []
+    quad_x = []
+    quad_z = []
+    # 侧面：邻居不是墙才需要画；底边被地面挡住，侧向被相邻的墙挡住
+    for (dx, dz), corners in _SIDE_FACES.values():
+        neighbour = padded[1 + dz:1 + dz + rows, 1 + dx:1 + dx + cols]
+        z, x = np.nonzero(walls & ~neighbour)
+        c = np.asarray(corners)
+        lx = np.where(dx == 0, c[:, 0], 0)
+        lz = np.where(dz == 0, c[:, 2], 0)
+        lateral = wall_at(x[:, None], z[:, None], dx + lx[None, :], dz + lz[None, :])
+        bottom = np.broadcast_to(c[None, :, 1] == 0, lateral.shape)
+        shade = _vertex_ao(lateral, bottom, bottom) * _face_light((dx, 0, dz))
+        parts.append(_quads((x + x0) * cell_size, (z + z0) * cell_size, corners, floor_y, wall_top, half,
+                            uv_rects, window[z, x], shade))
+        quad_x.append(x)
+        quad_z.append(z)
+    # 墙顶：所有墙一样高，上面没有遮挡
+    z, x = np.nonzero(walls)
+    shade = np.full((len(x), 4), _face_light((0, 1, 0)), dtype=np.float32)
+    parts.append(_quads((x + x0) * cell_size, (z + z0) * cell_size, _TOP_FACE, wall_top, wall_top, half,
+                        uv_rects, window[z, x], shade))
+    quad_x.append(x)
+    quad_z.append(z)
+    # 地面（入口、出口的材质也在这里）：角落被周围的墙遮挡
+    z, x = np.nonzero(~walls)
+    c = np.asarray(_TOP_FACE)
+    cx, cz = c[None, :, 0], c[None, :, 2]
+    side1 = wall_at(x[:, None], z[:, None], cx, 0)
+    side2 = wall_at(x[:, None], z[:, None], 0, cz)
+    corner = wall_at(x[:, None], z[:, None], cx, cz)
+    shade = _vertex_ao(side1, side2, corner) * _face_light((0, 1, 0))
+    parts.append(_quads((x + x0) * cell_size, (z + z0) * cell_size, _TOP_FACE, floor_y, floor_y, half,
+                        uv_rects, window[z, x], shade))
+    quad_x.append(x)
+    quad_z.append(z)
+
+    return np.concatenate(parts), np.concatenate(quad_x) + x0, np.concatenate(quad_z) + z0
+
+
+def _split_by_chunk(vertices, cell_x, cell_z, chunks_x, chunk_count):
+    """把四边形按所在块分组，返回每块的顶点数组列表"""
+    chunk = (cell_z // CHUNK_CELLS) * chunks_x + cell_x // CHUNK_CELLS
+    order = np.argsort(chunk, kind="stable")
+    vertices = vertices.reshape(len(chunk), 4, VERTEX_SIZE)[order].reshape(-1, VERTEX_SIZE)
+    ends = np.cumsum(np.bincount(chunk, minlength=chunk_count)) * 4
+    return np.split(vertices, ends[:-1])
+
+
+def _pack_chunks(pieces):
+    """把每块的顶点依次放进一个数组，每块后面留 CHUNK_SLACK 个四边形的空位
+
+    返回 (顶点, 每块的 (起始, 数量))，空位填 0，不会被画出来。
+    """
+    counts = np.array([len(p) for p in pieces], dtype=np.int64)
+    capacity = counts + CHUNK_SLACK * 4
+    starts = np.cumsum(capacity) - capacity
+    vertices = np.zeros((int(capacity.sum()), VERTEX_SIZE), dtype=np.float32)
+    for start, piece in zip(starts, pieces):
+        vertices[start:start + len(piece)] = piece
+    return vertices, np.column_stack([starts, counts]).astype(np.int32)
+
+
+def build_maze_mesh(materials, uv_rects, cell_size=CELL_SIZE, floor_y=FLOOR_Y, wall_top=WALL_TOP):
+    """根据每格材质生成迷宫网格
+
+    墙柱只生成朝向通路（或迷宫外）的侧面和顶面，两堵墙相邻的面被省掉；
+    通路格子只生成地面。每个顶点带烘焙好的光照颜色，顶点按 CHUNK_CELLS 大小的块排列。
+    """
+    materials = np.asarray(materials, dtype=np.uint8)
+    half = cell_size / 2
+    rows, cols = materials.shape
+
+    chunks_x = -(-cols // CHUNK_CELLS)
+    chunks_z = -(-rows // CHUNK_CELLS)
+    chunk_count = chunks_x * chunks_z
+    vertices, quad_x, quad_z = _bake_window(materials, uv_rects, 0, 0, cols, rows, cell_size, floor_y, wall_top)
+    vertices, vertex_ranges = _pack_chunks(_split_by_chunk(vertices, quad_x, quad_z, chunks_x, chunk_count))
+
+    # 每块的包围范围（XZ）
+    cz, cx = np.divmod(np.arange(chunk_count), chunks_x)
+    chunk_bounds = np.empty((chunk_count, 4), dtype=np.float32)
+    chunk_bounds[:, 0] = cx * CHUNK_CELLS * cell_size - half
+    chunk_bounds[:, 1] = cz * CHUNK_CELLS * cell_size - half
+    chunk_bounds[:, 2] = np.minimum((cx + 1) * CHUNK_CELLS, cols) * cell_size - half
+    chunk_bounds[:, 3] = np.minimum((cz + 1) * CHUNK_CELLS, rows) * cell_size - half
+
+    return MazeMesh(vertices, vertex_ranges, chunk_bounds)
+
+
+def rebake_cell(mesh, materials, uv_rects, x, z, cell_size=CELL_SIZE, floor_y=FLOOR_Y, wall_top=WALL_TOP):
+    """格子 (x, z) 的材质改变后，只重新烘焙受影响的块，返回重建的块编号列表
+
+    一个格子会影响自己和周围 8 个格子的面和遮蔽，所以重建这 3x3 范围碰到的块（最多 4 块），
+    新顶点写回 mesh.vertices 里这些块的位置。
+    """
+    materials = np.asarray(materials, dtype=np.uint8)
+    rows, cols = materials.shape
+    chunks_x = -(-cols // CHUNK_CELLS)
+    chunk_xs = range(max(x - 1, 0) // CHUNK_CELLS, min(x + 1, cols - 1) // CHUNK_CELLS + 1)
+    chunk_zs = range(max(z - 1, 0) // CHUNK_CELLS, min(z + 1, rows - 1) // CHUNK_CELLS + 1)
+    rebuilt = {}
+    for cz in chunk_zs:
+        for cx in chunk_xs:
+            x0, z0 = cx * CHUNK_CELLS, cz * CHUNK_CELLS
+            x1, z1 = min(x0 + CHUNK_CELLS, cols), min(z0 + CHUNK_CELLS, rows)
+            rebuilt[cz * chunks_x + cx] = _bake_window(materials, uv_rects, x0, z0, x1, z1,
+                                                       cell_size, floor_y, wall_top)[0]
+
+    # 新顶点放得下（不超过到下一块起点的空间）就原地写入，否则整个网格重新排列
+    ranges = mesh.vertex_ranges
+    capacity = np.append(ranges[1:, 0], len(mesh.vertices)) - ranges[:, 0]
+    if all(len(vertices) <= capacity[chunk] for chunk, vertices in rebuilt.items()):
+        for chunk, vertices in rebuilt.items():
+            start = ranges[chunk, 0]
+            mesh.vertices[start:start + len(vertices)] = vertices
+            ranges[chunk, 1] = len(vertices)
+    else:
+        pieces = [rebuilt[chunk] if chunk in rebuilt else mesh.vertices[start:start + count]
+                  for chunk, (start, count) in enumerate(ranges)]
+        mesh.vertices, mesh.vertex_ranges = _pack_chunks(pieces)
+    return sorted(rebuilt)
@@ -0,0 +1,127 @@
+## 迷宫批量渲染
+# 顶点数据放在 VBO 里，纹理图集只绑定一次，整个迷宫一次绘制调用，
+# 每个方块不再有 glColor3f / glBegin 之类的状态切换。烘焙好的光照作为顶点颜色和纹理相乘。
+# 指定 LOD 距离时只画距离内的块（glMultiDrawArrays，仍然是一次调用），远处用雾遮住。
+import ctypes
+
+import numpy as np
+
+from OpenGL.GL import *
+
+from materials import build_mipmaps
+from maze_mesh import VERTEX_SIZE
+
+
+def upload_atlas(atlas):
+    """上传纹理图集和手动生成的 mipmap，返回纹理 id"""
+    levels = build_mipmaps(atlas)
+    texture = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_2D, texture)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+    for level, image in enumerate(levels):
+        glTexImage2D(GL_TEXTURE_2D, level, GL_RGBA, image.shape[1], image.shape[0], 0,
+                     GL_RGBA, GL_UNSIGNED_BYTE, image)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_BASE_LEVEL, 0)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, len(levels) - 1)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+    glBindTexture(GL_TEXTURE_2D, 0)
+    return texture
+
+
+def upload_buffer(data):
+    """把 numpy 数组上传到 VBO，返回 buffer id"""
+    buffer = glGenBuffers(1)
+    glBindBuffer(GL_ARRAY_BUFFER, buffer)
+    glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_STATIC_DRAW)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+    return buffer
+
+
+def _draw_ranges(mode, ranges, mask):
+    """画 mask 选中的块；mask 为 None 时画所有块（块之间有预留空位，不能整段画）"""
+    selected = ranges[ranges[:, 1] > 0] if mask is None else ranges[mask & (ranges[:, 1] > 0)]
+    if len(selected):
+        glMultiDrawArrays(mode, np.ascontiguousarray(selected[:, 0]),
+                          np.ascontiguousarray(selected[:, 1]), len(selected))
+
+
+class MazeRenderer:
+    def __init__(self, mesh, atlas, fog_color=(0.1, 0.1, 0.1, 1.0)):
+        self.mesh = mesh
+        self.texture = upload_atlas(atlas)
+        self.vertex_buffer = upload_buffer(mesh.vertices)
+        self.uploaded_vertices = mesh.vertices  # 重新排列过的网格会换成新数组
+        self.fog_color = fog_color
+        self.drawn_chunks = len(mesh.vertex_ranges)  # 上一帧实际画了多少块
+
+    def update_vertices(self, chunks=None):
+        """mesh 重新烘焙过（rebake_cell）之后更新 VBO
+
+        chunks 是重建的块编号；顶点是原地写入的就只上传这些块，否则整个重新上传。
+        """
+        vertices = self.mesh.vertices
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        if chunks is not None and vertices is self.uploaded_vertices:
+            stride = VERTEX_SIZE * 4
+            for start, count in self.mesh.vertex_ranges[chunks]:
+                if count:
+                    glBufferSubData(GL_ARRAY_BUFFER, int(start) * stride, int(count) * stride,
+                                    vertices[start:start + count])
+        else:
+            glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+            self.uploaded_vertices = vertices
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def begin(self, lod_distance=None):
+        """绑定 VBO、图集和顶点格式，之后可以多次 draw_chunks（多个视图共用这一套状态）
+
+        给出 lod_distance 时开启线性雾，在 lod_distance 处淡出到背景色。
+        """
+        if lod_distance is not None:
+            glEnable(GL_FOG)
+            glFogi(GL_FOG_MODE, GL_LINEAR)
+            glFogfv(GL_FOG_COLOR, self.fog_color)
+            glFogf(GL_FOG_START, lod_distance * 0.6)
+            glFogf(GL_FOG_END, lod_distance)
+
+        stride = VERTEX_SIZE * 4
+        glEnableClientState(GL_VERTEX_ARRAY)
+        # 材质批次：所有格子共用一张图集
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_buffer)
+        glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p(0))
+        glTexCoordPointer(2, GL_FLOAT, stride, ctypes.c_void_p(12))
+        glColorPointer(3, GL_FLOAT, stride, ctypes.c_void_p(20))
+
+    def draw_chunks(self, mask=None):
+        """画 mask 选中的块（mask 为 None 时全画），需要在 begin / end 之间调用"""
+        _draw_ranges(GL_QUADS, self.mesh.vertex_ranges, mask)
+
+    def end(self):
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_TEXTURE_2D)
+        glColor3f(1.0, 1.0, 1.0)  # 颜色数组用完后当前颜色不确定，恢复成白色
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glDisable(GL_FOG)
+
+    def draw(self, eye=None, lod_distance=None):
+        """一次绘制墙面和地面
+
+        给出 eye 和 lod_distance 时只画这个距离内的块，并用线性雾在 lod_distance 处淡出到背景色。
+        """
+        mask = None
+        if eye is not None and lod_distance is not None:
+            mask = self.mesh.chunks_within(eye, lod_distance)
+            self.drawn_chunks = int(mask.sum())
+        self.begin(lod_distance if mask is not None else None)
+        self.draw_chunks(mask)
+        self.end()
@@ -0,0 +1,167 @@
+## 小地图
+# 整个迷宫一格一个像素做成一张纹理，只在开始时用 numpy 生成并上传一次；
+# 之后只有走过的格子、被修改的格子所在的脏矩形用 glTexSubImage2D 重新上传。
+# 每帧只画一个贴图四边形（纹理坐标取玩家周围的一块）和一个表示玩家的三角形，开销和迷宫大小无关。
+# 需要支持非 2 的幂纹理（OpenGL 2.0），纹理边长不能超过 GL_MAX_TEXTURE_SIZE。
+import math
+
+import numpy as np
+
+from OpenGL.GL import *
+
+from world import CELL_FLOOR, CELL_WALL, CELL_ENTRANCE, CELL_EXIT
+
+# 调色板：[是否走过, 格子代码] -> RGBA，没走过的格子暗一些（战争迷雾）
+_PALETTE = np.zeros((2, 4, 4), dtype=np.uint8)
+_PALETTE[1, CELL_FLOOR] = (150, 120, 90, 230)
+_PALETTE[1, CELL_WALL] = (60, 60, 90, 230)
+_PALETTE[1, CELL_ENTRANCE] = (40, 200, 60, 230)
+_PALETTE[1, CELL_EXIT] = (220, 50, 50, 230)
+_PALETTE[0] = _PALETTE[1] // 3
+_PALETTE[0, :, 3] = 200
+_PALETTE[0, CELL_EXIT] = (220, 50, 50, 230)  # 出口一直可见
+
+
+def minimap_image(cells, visited):
+    """格子代码和是否走过 -> RGBA 图像（行对应 z，列对应 x）"""
+    return _PALETTE[visited.view(np.uint8), cells]
+
+
+def minimap_supported(world):
+    """整个迷宫能不能放进一张纹理（边长不超过 GL_MAX_TEXTURE_SIZE）"""
+    return max(world.shape) <= int(glGetIntegerv(GL_MAX_TEXTURE_SIZE))
+
+
+class Minimap:
+    def __init__(self, world, size=180, margin=12, view_cells=40, reveal_radius=2):
+        if not minimap_supported(world):
+            raise ValueError(f"迷宫 {world.shape[1]}x{world.shape[0]} 超过 GL_MAX_TEXTURE_SIZE，无法做成小地图纹理")
+        self.world = world
+        self.size = size  # 屏幕上的边长（像素）
+        self.margin = margin
+        self.view_cells = min(view_cells, max(world.shape))  # 小地图显示玩家周围多少格
+        self.reveal_radius = reveal_radius  # 走到一个格子时点亮周围多少格
+        self.visible = True
+
+        self.visited = np.zeros(world.shape, dtype=bool)
+        self.image = minimap_image(world.cells, self.visited)
+        self.dirty = None  # 待上传的脏矩形 (x0, z0, x1, z1)
+        self.last_cell = None
+        self.uploaded_texels = 0  # 上一次 update 上传了多少像素
+
+        rows, cols = world.shape
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, cols, rows, 0, GL_RGBA, GL_UNSIGNED_BYTE, self.image)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        # 视野超出迷宫的部分显示透明
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_BORDER)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_BORDER)
+        glTexParameterfv(GL_TEXTURE_2D, GL_TEXTURE_BORDER_COLOR, (0.0, 0.0, 0.0, 0.0))
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def _mark_dirty(self, x0, z0, x1, z1):
+        if self.dirty is not None:
+            dx0, dz0, dx1, dz1 = self.dirty
+            x0, z0, x1, z1 = min(x0, dx0), min(z0, dz0), max(x1, dx1), max(z1, dz1)
+        self.dirty = (x0, z0, x1, z1)
+
+    def reveal(self, x, z, radius=None):
+        """把格子 (x, z) 周围 radius 格标记为走过"""
+        radius = self.reveal_radius if radius is None else radius
+        rows, cols = self.world.shape
+        x0, x1 = max(x - radius, 0), min(x + radius + 1, cols)
+        z0, z1 = max(z - radius, 0), min(z + radius + 1, rows)
+        if x0 < x1 and z0 < z1:
+            self.visited[z0:z1, x0:x1] = True
+            self._mark_dirty(x0, z0, x1, z1)
+
+    def cell_changed(self, x, z):
+        """World.cells 里的格子被修改后调用，重新上传这一格"""
+        self._mark_dirty(x, z, x + 1, z + 1)
+
+    def update(self, position):
+        """玩家换了格子就点亮周围，然后只上传脏矩形"""
+        cell = self.world.cell_at(position)
+        if cell != self.last_cell:
+            self.last_cell = cell
+            self.reveal(*cell)
+
+        self.uploaded_texels = 0
+        if self.dirty is None:
+            return
+        x0, z0, x1, z1 = self.dirty
+        self.dirty = None
+        region = minimap_image(self.world.cells[z0:z1, x0:x1], self.visited[z0:z1, x0:x1])
+        self.image[z0:z1, x0:x1] = region
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, x0, z0, x1 - x0, z1 - z0, GL_RGBA, GL_UNSIGNED_BYTE, region)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        self.uploaded_texels = region.shape[0] * region.shape[1]
+
+    def draw(self, position, yaw, screen_width, screen_height):
+        """在右上角画小地图，调用时需要已经是像素坐标的正交投影（draw_crosshair 里）"""
+        if not self.visible:
+            return
+        rows, cols = self.world.shape
+        cell_size = self.world.cell_size
+        # 玩家所在的连续格子坐标（格子中心是整数）
+        px = position[0] / cell_size + 0.5
+        pz = position[2] / cell_size + 0.5
+        # 视野窗口跟着玩家，但不超出迷宫（迷宫比视野小就居中）
+        half = self.view_cells / 2
+        center_x = min(max(px, half), cols - half) if cols > self.view_cells else cols / 2
+        center_z = min(max(pz, half), rows - half) if rows > self.view_cells else rows / 2
+        u0, u1 = (center_x - half) / cols, (center_x + half) / cols
+        v0, v1 = (center_z - half) / rows, (center_z + half) / rows
+
+        left = screen_width - self.margin - self.size
+        top = screen_height - self.margin
+        right, bottom = left + self.size, top - self.size
+
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glColor4f(1.0, 1.0, 1.0, 1.0)
+        # 纹理的行是 z，z 越大在屏幕上越靠下
+        glBegin(GL_QUADS)
+        glTexCoord2f(u0, v0)
+        glVertex2f(left, top)
+        glTexCoord2f(u1, v0)
+        glVertex2f(right, top)
+        glTexCoord2f(u1, v1)
+        glVertex2f(right, bottom)
+        glTexCoord2f(u0, v1)
+        glVertex2f(left, bottom)
+        glEnd()
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_TEXTURE_2D)
+
+        # 边框
+        glColor3f(1.0, 1.0, 1.0)
+        glBegin(GL_LINE_LOOP)
+        glVertex2f(left, top)
+        glVertex2f(right, top)
+        glVertex2f(right, bottom)
+        glVertex2f(left, bottom)
+        glEnd()
+
+        # 玩家标记：指向视线方向的三角形
+        scale = self.size / self.view_cells
+        cx = (left + right) / 2 + (px - center_x) * scale
+        cy = (top + bottom) / 2 - (pz - center_z) * scale
+        yaw_rad = math.radians(yaw)
+        fx, fy = math.cos(yaw_rad), -math.sin(yaw_rad)  # 世界 +z 在屏幕上朝下
+        rx, ry = -fy, fx
+        r = 7.0  # 标记大小（像素），不随缩放变化
+        glColor3f(1.0, 1.0, 0.2)
+        glBegin(GL_TRIANGLES)
+        glVertex2f(cx + fx * r, cy + fy * r)
+        glVertex2f(cx - fx * r * 0.6 + rx * r * 0.6, cy - fy * r * 0.6 + ry * r * 0.6)
+        glVertex2f(cx - fx * r * 0.6 - rx * r * 0.6, cy - fy * r * 0.6 - ry * r * 0.6)
+        glEnd()
+        glDisable(GL_BLEND)
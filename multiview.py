@@ -0,0 +1,146 @@
+## 多视图渲染
+# 一帧画多个摄像机（分屏、跟随机器人的观战视角、缩略图预览）。
+# 所有视图的视锥体剔除在一次 numpy 运算里做完（视图数 x 块数），静态迷宫的 VBO、图集和顶点格式
+# 只绑定一次，每个视图只切换视口（或离屏目标）、加载矩阵，然后一次 glMultiDrawArrays。
+import math
+import time
+
+import numpy as np
+
+from OpenGL.GL import *
+
+from maze_data import FLOOR_Y, WALL_TOP
+from matrix_utils import get_projection_matrix
+
+
+class View:
+    def __init__(self, camera, viewport, fov=90, near=0.1, far=100.0, target=None):
+        self.camera = camera
+        self.viewport = viewport  # 窗口里的 (x, y, w, h)
+        self.fov = fov
+        self.near = near
+        self.far = far
+        self.target = target  # 不为 None 时先画到这个 RenderTarget，再缩放拷贝到 viewport
+        self.drawn_chunks = 0
+        self.frame_ms = 0.0  # 上一次提交这个视图的耗时（submit 传了 timed=True 时才有）
+
+    def matrix(self):
+        """投影 x 视图矩阵，宽高比按视图自己的大小"""
+        _, _, w, h = self.viewport
+        if self.target is not None:
+            w, h = self.target.width, self.target.height
+        return get_projection_matrix(self.fov, w / max(h, 1), self.near, self.far) @ self.camera.get_view_matrix()
+
+
+def look_at(camera, eye, target):
+    """把摄像机放到 eye 并朝向 target（观战视角用）"""
+    camera.position[:] = eye
+    d = np.asarray(target, dtype=np.float64) - np.asarray(eye, dtype=np.float64)
+    camera.yaw = math.degrees(math.atan2(d[2], d[0]))
+    camera.pitch = max(min(math.degrees(math.atan2(d[1], math.hypot(d[0], d[2]))), 89.0), -89.0)
+    camera.update_camera_vectors()
+
+
+def split_viewports(count, width, height):
+    """把窗口平均分成 count 个视口（接近正方形的网格，从左上角开始），返回 [(x, y, w, h), ...]"""
+    cols = math.ceil(math.sqrt(count))
+    rows = math.ceil(count / cols)
+    w, h = width // cols, height // rows
+    return [((i % cols) * w, height - (i // cols + 1) * h, w, h) for i in range(count)]
+
+
+def frustum_planes(matrices):
+    """从 (V, 4, 4) 的投影 x 视图矩阵取出视锥体 6 个平面，返回 (V, 6, 4)，点在平面正侧即在内部"""
+    m = np.asarray(matrices, dtype=np.float64)
+    rows = m[:, :3, :]
+    w = m[:, 3:4, :]
+    return np.concatenate([w + rows, w - rows], axis=1)
+
+
+def cull_chunks(matrices, chunk_bounds, y_min=FLOOR_Y, y_max=WALL_TOP):
+    """所有视图一次剔除：返回 (V, 块数) 的 bool 数组，块的包围盒和视锥体相交为 True
+
+    每个平面只检查包围盒在法线方向上最远的角（p 顶点），在平面外侧就整块不可见。
+    """
+    planes = frustum_planes(matrices)
+    b = chunk_bounds
+    a, c, e = planes[..., 0:1], planes[..., 1:2], planes[..., 2:3]
+    px = np.where(a > 0, b[None, None, :, 2], b[None, None, :, 0])
+    py = np.where(c > 0, y_max, y_min)
+    pz = np.where(e > 0, b[None, None, :, 3], b[None, None, :, 1])
+    distance = a * px + c * py + e * pz + planes[..., 3:4]
+    return (distance >= 0).all(axis=1)
+
+
+class FramePlan:
+    def __init__(self, views, matrices, visible, cull_ms):
+        self.views = views
+        self.matrices = matrices  # 每个视图的投影 x 视图矩阵
+        self.visible = visible  # (视图数, 块数) 每个视图能看到的块
+        self.union = visible.any(axis=0)  # 至少一个视图能看到的块
+        self.cull_ms = cull_ms
+
+
+class MultiViewRenderer:
+    def __init__(self, maze_renderer, lod_distance=None):
+        self.maze_renderer = maze_renderer  # 共用它的 VBO 和图集
+        self.lod_distance = lod_distance  # 给出时每个视图还按距离剔除并加雾
+
+    def plan(self, views):
+        """CPU 部分：所有视图一起剔除，返回 FramePlan（可以在 GL 之外单独计时）"""
+        start = time.perf_counter()
+        mesh = self.maze_renderer.mesh
+        matrices = [view.matrix() for view in views]
+        visible = cull_chunks(matrices, mesh.chunk_bounds)
+        if self.lod_distance is not None:
+            for i, view in enumerate(views):
+                visible[i] &= mesh.chunks_within(view.camera.position, self.lod_distance)
+        return FramePlan(views, matrices, visible, (time.perf_counter() - start) * 1e3)
+
+    def submit(self, plan, window_size, shared=False, timed=False, extra=None):
+        """GPU 部分：状态绑定一次，每个视图切视口、加载矩阵、一次多段绘制
+
+        shared 为 True 时每个视图都画所有视图可见块的并集（选块只做一次，多画的部分交给 GPU 裁剪）；
+        timed 为 True 时每个视图后 glFinish，View.frame_ms 是这个视图的 GPU + 提交耗时（仅用于测量）；
+        extra(view) 在迷宫画完后对每个直接画在窗口上的视图调用一次，用来画其他玩家之类的动态物体。
+        """
+        renderer = self.maze_renderer
+        renderer.begin(self.lod_distance)
+        glEnable(GL_SCISSOR_TEST)
+        for i, view in enumerate(plan.views):
+            start = time.perf_counter()
+            if view.target is not None:
+                view.target.begin(1.0)
+                glScissor(0, 0, view.target.width, view.target.height)
+            else:
+                glViewport(*view.viewport)
+                glScissor(*view.viewport)
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            glMatrixMode(GL_MODELVIEW)
+            glLoadMatrixf(plan.matrices[i].T)
+
+            mask = plan.union if shared else plan.visible[i]
+            view.drawn_chunks = int(mask.sum())
+            renderer.draw_chunks(mask)
+            if view.target is not None:
+                glScissor(*view.viewport)  # 拷贝也受裁剪矩形限制
+                view.target.end(view.viewport, window_size)
+            if timed:
+                glFinish()
+                view.frame_ms = (time.perf_counter() - start) * 1e3
+        renderer.end()
+
+        if extra is not None:
+            for view, matrix in zip(plan.views, plan.matrices):
+                if view.target is None:
+                    glViewport(*view.viewport)
+                    glScissor(*view.viewport)
+                    glLoadMatrixf(matrix.T)
+                    extra(view)
+        glDisable(GL_SCISSOR_TEST)
+        glViewport(0, 0, *window_size)
+
+    def draw(self, views, window_size, shared=False, timed=False, extra=None):
+        plan = self.plan(views)
+        self.submit(plan, window_size, shared, timed, extra)
+        return plan
@@ -0,0 +1,175 @@
+## 客户端：本地预测 + 服务器校正
+# 每个固定步长生成一条输入，立即用 Camera.process_keyboard / update_physics 在本地预测，
+# 收到快照后回到服务器确认的状态，再重放服务器还没处理的输入。
+# 模拟大量客户端：python net_client.py --bots 100 --seconds 10 [--port 5000]
+import argparse
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+from maze_data import maze_layout, ENTRANCE, EXIT
+from world import World
+import netcode
+
+CLIENT_SNAPSHOT_HISTORY = 64  # 客户端保留的快照份数（用来解码增量）
+
+
+class GameClient:
+    def __init__(self, world=None):
+        self.world = world if world is not None else World.from_layout(maze_layout, ENTRANCE, EXIT)
+        netcode.check_world_range(self.world)
+        self.player_id = None
+        self.tick_rate = netcode.TICK_RATE
+        self.camera = netcode.new_player(self.world.spawn_position())  # 和服务器的出生点一致
+
+        self.seq = 0
+        self.pending = deque()  # 已发送、服务器还没确认的 (seq, buttons, yaw, pitch)
+        self.jump_times = {}  # seq -> 预测完这一帧后的 last_jump_time（跳跃冷却不在快照里）
+        self.snapshots = {}  # 快照 id -> {玩家 id: 量化状态}
+        self.latest_snapshot = 0
+        self.remote_players = {}  # 其他玩家的量化状态
+        self.corrections = 0  # 预测和服务器不一致的次数
+        self.synced = False  # 是否已经收到过自己的服务器状态
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+        self.reader = None
+        self.writer = None
+
+    async def connect(self, host="127.0.0.1", port=5000):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        data = await netcode.read_message(self.reader)
+        self.bytes_received += len(data) + 2
+        self.player_id, self.tick_rate = netcode.decode_hello(data)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    def send_input(self, buttons, yaw=None, pitch=None):
+        """发送一帧输入并立即在本地预测，yaw/pitch 默认取当前摄像机朝向（角度）"""
+        yaw = netcode.quantize_angle(self.camera.yaw if yaw is None else yaw)
+        pitch = int(round((self.camera.pitch if pitch is None else pitch) * netcode.ANGLE_SCALE))
+        self.seq += 1
+        command = (self.seq, buttons, yaw, pitch)
+        self.pending.append(command)
+        self._predict(command)
+
+        message = netcode.frame(netcode.encode_input(self.seq, self.latest_snapshot, buttons, yaw, pitch))
+        self.bytes_sent += len(message)
+        self.writer.write(message)
+
+    def _predict(self, command):
+        seq, buttons, yaw, pitch = command
+        cubes = self.world.cubes_around(self.camera.position)
+        netcode.step_player(self.camera, seq, buttons, yaw, pitch, 1.0 / self.tick_rate, cubes)
+        self.jump_times[seq] = self.camera.last_jump_time
+
+    def on_snapshot(self, data):
+        """解码快照，用服务器状态校正本地预测"""
+        snapshot_id, _, input_ack, states = netcode.decode_snapshot(data, self.snapshots)
+        self.snapshots[snapshot_id] = states
+        self.snapshots.pop(snapshot_id - CLIENT_SNAPSHOT_HISTORY, None)
+        self.latest_snapshot = max(self.latest_snapshot, snapshot_id)
+        self.remote_players = {pid: s for pid, s in states.items() if pid != self.player_id}
+
+        server_state = states.get(self.player_id)
+        if server_state is None:
+            return
+        while self.pending and self.pending[0][0] <= input_ack:
+            self.pending.popleft()
+        last_jump_time = self.jump_times.get(input_ack, -float('inf'))
+        for seq in [seq for seq in self.jump_times if seq < input_ack]:
+            del self.jump_times[seq]
+
+        # 回到服务器状态重放未确认输入；保留本地视角，鼠标转动不等服务器
+        yaw, pitch = self.camera.yaw, self.camera.pitch
+        predicted = self.camera.position.copy()
+        netcode.apply_state(self.camera, server_state)
+        self.camera.last_jump_time = last_jump_time
+        for command in self.pending:
+            self._predict(command)
+        if self.synced and not np.allclose(predicted, self.camera.position,
+                                           atol=1.0 / netcode.POSITION_SCALE):
+            self.corrections += 1
+        self.synced = True
+        self.camera.yaw, self.camera.pitch = yaw, pitch
+        self.camera.update_camera_vectors()
+
+    async def receive_loop(self):
+        """持续接收快照，连接断开时返回"""
+        try:
+            while True:
+                data = await netcode.read_message(self.reader)
+                self.bytes_received += len(data) + 2
+                if data[0] == netcode.MSG_SNAPSHOT:
+                    self.on_snapshot(data)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+
+async def run_bot(client, duration, seed):
+    """模拟一个随机走动的玩家"""
+    rng = np.random.default_rng(seed)
+    receiver = asyncio.create_task(client.receive_loop())
+    loop = asyncio.get_running_loop()
+    interval = 1.0 / client.tick_rate
+    next_tick = loop.time()
+    end = next_tick + duration
+    buttons = netcode.BUTTON_FORWARD
+    yaw = float(rng.uniform(0, 360))
+    while next_tick < end:
+        if rng.random() < 0.05:
+            buttons = int(rng.choice([netcode.BUTTON_FORWARD, netcode.BUTTON_LEFT,
+                                      netcode.BUTTON_RIGHT, netcode.BUTTON_BACKWARD, 0]))
+            yaw = (yaw + float(rng.uniform(-90, 90))) % 360
+        jump = netcode.BUTTON_JUMP if rng.random() < 0.01 else 0
+        client.send_input(buttons | jump, yaw, 0.0)
+        next_tick += interval
+        await asyncio.sleep(max(0.0, next_tick - loop.time()))
+    client.close()
+    await receiver
+
+
+async def simulate(bots, seconds, host="127.0.0.1", port=None, tick_rate=netcode.TICK_RATE):
+    """启动 bots 个模拟客户端（port 为 None 时在同一进程里起一个服务器），返回统计结果"""
+    server = None
+    server_task = None
+    if port is None:
+        from net_server import GameServer
+        server = GameServer(tick_rate=tick_rate)
+        port = await server.start(host, 0)
+        server_task = asyncio.create_task(server.run())
+
+    world = World.from_layout(maze_layout, ENTRANCE, EXIT)
+    clients = [GameClient(world) for _ in range(bots)]
+    await asyncio.gather(*(client.connect(host, port) for client in clients))
+    start = time.perf_counter()
+    await asyncio.gather(*(run_bot(client, seconds, seed) for seed, client in enumerate(clients)))
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        "bots": bots,
+        "down_bytes_per_client_s": sum(c.bytes_received for c in clients) / bots / elapsed,
+        "up_bytes_per_client_s": sum(c.bytes_sent for c in clients) / bots / elapsed,
+        "corrections": sum(c.corrections for c in clients),
+    }
+    if server is not None:
+        server_task.cancel()
+        await server.stop()
+        stats["tick_mean_ms"], stats["tick_p99_ms"] = server.tick_stats()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="模拟大量客户端连接服务器")
+    parser.add_argument("--bots", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="不指定时在本进程内启动服务器")
+    args = parser.parse_args()
+    result = asyncio.run(simulate(args.bots, args.seconds, args.host, args.port))
+    for key, value in result.items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
@@ -0,0 +1,157 @@
+## 权威服务器
+# 固定 tick 推进所有玩家的物理，客户端通过本地 socket（asyncio）连接，
+# 发送输入，接收相对上次确认快照的增量快照。
+# 运行：python net_server.py [--port 5000]
+import argparse
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+from maze_data import maze_layout, ENTRANCE, EXIT
+from world import World
+import netcode
+
+SNAPSHOT_HISTORY = 64  # 保留最近多少份快照作为增量基准
+
+
+class Player:
+    def __init__(self, player_id, camera, writer):
+        self.id = player_id
+        self.camera = camera
+        self.writer = writer
+        self.commands = deque()  # 待处理的 (seq, buttons, yaw, pitch)
+        self.last_seq = 0  # 已经处理到的输入序号
+        self.acked_snapshot = 0  # 客户端确认收到的最新快照
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+
+class GameServer:
+    def __init__(self, world=None, tick_rate=netcode.TICK_RATE,
+                 snapshot_interval=netcode.SNAPSHOT_INTERVAL, spawn=None):
+        self.world = world if world is not None else World.from_layout(maze_layout, ENTRANCE, EXIT)
+        netcode.check_world_range(self.world)
+        self.tick_rate = tick_rate
+        self.snapshot_interval = snapshot_interval
+        # 出生在入口格子，和 main.py 里的单机出生点一致
+        self.spawn = spawn if spawn is not None else tuple(self.world.spawn_position())
+
+        self.players = {}
+        self.next_player_id = 1
+        self.tick_count = 0
+        self.snapshot_id = 0
+        self.history = {}  # 快照 id -> {玩家 id: 量化状态}
+        self.tick_times = []  # 每个 tick 的耗时（秒）
+        self.server = None
+
+    # ---- 连接 ----
+    async def start(self, host="127.0.0.1", port=0):
+        self.server = await asyncio.start_server(self._handle_client, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for player in list(self.players.values()):
+            player.writer.close()
+
+    async def _handle_client(self, reader, writer):
+        player_id = self.next_player_id
+        self.next_player_id += 1
+        player = Player(player_id, netcode.new_player(self.spawn), writer)
+        netcode.apply_state(player.camera, netcode.quantize_state(player.camera))
+        self.players[player_id] = player
+        self._send(player, netcode.encode_hello(player_id, self.tick_rate))
+        try:
+            while True:
+                data = await netcode.read_message(reader)
+                player.bytes_received += len(data) + 2
+                if not data:
+                    break  # 空消息不合协议，断开这个客户端
+                if data[0] == netcode.MSG_INPUT:
+                    seq, ack, buttons, yaw, pitch = netcode.decode_input(data)
+                    player.acked_snapshot = max(player.acked_snapshot, ack)
+                    if seq > player.last_seq:
+                        player.commands.append((seq, buttons, yaw, pitch))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # 断线或消息格式不对（ValueError）都只断开这个客户端
+        finally:
+            self.players.pop(player_id, None)
+            writer.close()
+
+    def _send(self, player, payload):
+        message = netcode.frame(payload)
+        player.bytes_sent += len(message)
+        player.writer.write(message)
+
+    # ---- 模拟 ----
+    def tick(self):
+        """推进一个固定步长，必要时广播快照"""
+        start = time.perf_counter()
+        delta_time = 1.0 / self.tick_rate
+        for player in self.players.values():
+            cubes = self.world.cubes_around(player.camera.position)
+            for _ in range(min(len(player.commands), netcode.MAX_COMMANDS_PER_TICK)):
+                seq, buttons, yaw, pitch = player.commands.popleft()
+                netcode.step_player(player.camera, seq, buttons, yaw, pitch, delta_time, cubes)
+                player.last_seq = seq
+
+        self.tick_count += 1
+        if self.tick_count % self.snapshot_interval == 0:
+            self._broadcast_snapshot()
+        self.tick_times.append(time.perf_counter() - start)
+
+    def _broadcast_snapshot(self):
+        self.snapshot_id += 1
+        states = {pid: netcode.quantize_state(p.camera) for pid, p in self.players.items()}
+        self.history[self.snapshot_id] = states
+        self.history.pop(self.snapshot_id - SNAPSHOT_HISTORY, None)
+
+        for player in self.players.values():
+            base_id = player.acked_snapshot
+            base_states = self.history.get(base_id)
+            payload = netcode.encode_snapshot(self.snapshot_id, states, base_id, base_states,
+                                              input_ack=player.last_seq)
+            self._send(player, payload)
+
+    async def run(self, duration=None):
+        """按固定频率调用 tick，duration 为 None 时一直运行"""
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.tick_rate
+        next_tick = loop.time()
+        end = None if duration is None else next_tick + duration
+        while end is None or next_tick < end:
+            self.tick()
+            next_tick += interval
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    def tick_stats(self):
+        """返回 (平均, p99) tick 耗时，单位毫秒"""
+        if not self.tick_times:
+            return 0.0, 0.0
+        times = np.asarray(self.tick_times) * 1e3
+        return float(times.mean()), float(np.percentile(times, 99))
+
+
+async def _main(args):
+    server = GameServer(tick_rate=args.tick_rate)
+    port = await server.start(args.host, args.port)
+    print(f"服务器已启动 {args.host}:{port}，tick {args.tick_rate}Hz")
+    try:
+        await server.run()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="迷宫权威服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--tick-rate", type=int, default=netcode.TICK_RATE)
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
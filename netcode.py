@@ -0,0 +1,196 @@
+## 客户端/服务器共用的协议和模拟
+# 消息格式：2 字节长度 + 消息体，消息体第一个字节是类型，所有整数小端。
+# 玩家状态量化成整数后再做增量压缩：只发送相对客户端已确认快照变化了的字段。
+import struct
+
+import numpy as np
+
+from camera import Camera
+
+MSG_HELLO = 0  # 服务器 -> 客户端：分配的玩家 id 和 tick 频率
+MSG_INPUT = 1  # 客户端 -> 服务器：一帧输入
+MSG_SNAPSHOT = 2  # 服务器 -> 客户端：增量快照
+
+TICK_RATE = 60  # 服务器模拟频率（次/秒），客户端按同样的固定步长预测
+SNAPSHOT_INTERVAL = 2  # 每 2 个 tick 发一次快照
+MAX_COMMANDS_PER_TICK = 4  # 每个 tick 每个玩家最多处理的输入数，防止积压后瞬移
+
+# 按键位
+BUTTON_FORWARD = 1
+BUTTON_BACKWARD = 2
+BUTTON_LEFT = 4
+BUTTON_RIGHT = 8
+BUTTON_JUMP = 16
+_DIRECTIONS = ((BUTTON_FORWARD, "FORWARD"), (BUTTON_BACKWARD, "BACKWARD"),
+               (BUTTON_LEFT, "LEFT"), (BUTTON_RIGHT, "RIGHT"))
+
+# 量化精度：位置 1/128 单位（int16 能表示 ±256，即 128 格以内的迷宫），角度 360/65536 度，竖直速度 1/256
+POSITION_SCALE = 128
+MAX_POSITION = 0x7FFF / POSITION_SCALE  # 量化后能表示的最大坐标，超出会被截断
+ANGLE_SCALE = 65536 / 360
+VELOCITY_SCALE = 256
+FLAG_GROUNDED = 1
+
+# 量化后的玩家状态字段：x, y, z, yaw, pitch, velocity_y, flags
+STATE_FIELDS = ("h", "h", "h", "H", "h", "h", "B")
+
+_HEADER = struct.Struct("<H")
+_HELLO = struct.Struct("<BHH")
+_INPUT = struct.Struct("<BIIBHh")
+_SNAPSHOT = struct.Struct("<BIIIHH")
+_RECORD = struct.Struct("<HB")
+_FIELD_STRUCTS = [struct.Struct("<" + code) for code in STATE_FIELDS]
+_REMOVED = struct.Struct("<H")
+
+
+def _clamp(value, code):
+    if code == "B":
+        return min(max(value, 0), 0xFF)
+    if code == "H":
+        return value & 0xFFFF
+    return min(max(value, -0x8000), 0x7FFF)
+
+
+def check_world_range(world):
+    """迷宫超出量化位置能表示的范围时抛 ValueError（否则玩家会被钉在范围边上）"""
+    rows, cols = world.shape
+    extent = (max(rows, cols) - 0.5) * world.cell_size
+    if extent > MAX_POSITION:
+        raise ValueError(f"迷宫 {cols}x{rows} 的坐标到 {extent:g}，超出联机位置量化范围 ±{MAX_POSITION:g}")
+
+
+def quantize_angle(degrees):
+    return int(round(degrees * ANGLE_SCALE)) & 0xFFFF
+
+
+def quantize_state(camera):
+    """把摄像机状态量化成整数元组"""
+    values = (
+        int(round(float(camera.position[0]) * POSITION_SCALE)),
+        int(round(float(camera.position[1]) * POSITION_SCALE)),
+        int(round(float(camera.position[2]) * POSITION_SCALE)),
+        quantize_angle(camera.yaw),
+        int(round(camera.pitch * ANGLE_SCALE)),
+        int(round(camera.velocity_y * VELOCITY_SCALE)),
+        FLAG_GROUNDED if camera.is_grounded else 0,
+    )
+    return tuple(_clamp(v, code) for v, code in zip(values, STATE_FIELDS))
+
+
+def apply_state(camera, state):
+    """把量化状态写回摄像机"""
+    x, y, z, yaw, pitch, velocity_y, flags = state
+    camera.position[:] = (x / POSITION_SCALE, y / POSITION_SCALE, z / POSITION_SCALE)
+    camera.yaw = yaw / ANGLE_SCALE
+    camera.pitch = pitch / ANGLE_SCALE
+    camera.velocity_y = velocity_y / VELOCITY_SCALE
+    camera.is_grounded = bool(flags & FLAG_GROUNDED)
+    camera.update_camera_vectors()
+
+
+def new_player(spawn):
+    """创建一个玩家用的摄像机（位置数组必须各自独立）"""
+    return Camera(position=np.array(spawn, dtype=np.float32))
+
+
+def step_player(camera, seq, buttons, yaw, pitch, delta_time, cubes):
+    """用第 seq 帧输入推进玩家，服务器模拟和客户端预测共用"""
+    camera.yaw = yaw / ANGLE_SCALE
+    camera.pitch = pitch / ANGLE_SCALE
+    camera.update_camera_vectors()
+
+    any_key_pressed = False
+    for bit, direction in _DIRECTIONS:
+        if buttons & bit:
+            camera.process_keyboard(direction, delta_time, cubes)
+            any_key_pressed = True
+    if buttons & BUTTON_JUMP:
+        camera.jump(seq * delta_time)
+    camera.is_moving = any_key_pressed
+
+    camera.update_physics(delta_time, cubes)
+    # 每步都对齐到量化精度，服务器和客户端重放时从完全相同的状态出发
+    apply_state(camera, quantize_state(camera))
+
+
+# ---- 编码 / 解码 ----
+def frame(payload):
+    """加上长度前缀"""
+    return _HEADER.pack(len(payload)) + payload
+
+
+async def read_message(reader):
+    """从 asyncio StreamReader 读一条完整消息"""
+    size, = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return await reader.readexactly(size)
+
+
+def encode_hello(player_id, tick_rate=TICK_RATE):
+    return _HELLO.pack(MSG_HELLO, player_id, tick_rate)
+
+
+def decode_hello(data):
+    _, player_id, tick_rate = _HELLO.unpack(data)
+    return player_id, tick_rate
+
+
+def encode_input(seq, ack_snapshot, buttons, yaw, pitch):
+    """yaw/pitch 是已经量化的整数"""
+    return _INPUT.pack(MSG_INPUT, seq, ack_snapshot, buttons, yaw, _clamp(pitch, "h"))
+
+
+def decode_input(data):
+    """返回 (seq, ack_snapshot, buttons, yaw, pitch)，长度不对时抛 ValueError"""
+    if len(data) != _INPUT.size:
+        raise ValueError(f"输入消息应为 {_INPUT.size} 字节，收到 {len(data)} 字节")
+    return _INPUT.unpack(data)[1:]
+
+
+def encode_snapshot(snapshot_id, states, base_id=0, base_states=None, input_ack=0):
+    """把 {玩家 id: 量化状态} 编码成相对 base_states 的增量
+
+    base_states 为 None 时发送完整快照（base_id 为 0）。
+    每个变化的玩家写 id、一个字段掩码和变化的字段；消失的玩家只写 id。
+    """
+    if base_states is None:
+        base_id, base_states = 0, {}
+    records = []
+    for player_id, state in states.items():
+        base = base_states.get(player_id)
+        mask = 0
+        fields = []
+        for i, value in enumerate(state):
+            if base is None or base[i] != value:
+                mask |= 1 << i
+                fields.append(_FIELD_STRUCTS[i].pack(value))
+        if mask:
+            records.append(_RECORD.pack(player_id, mask) + b"".join(fields))
+    removed = [_REMOVED.pack(player_id) for player_id in base_states if player_id not in states]
+    header = _SNAPSHOT.pack(MSG_SNAPSHOT, snapshot_id, base_id, input_ack, len(records), len(removed))
+    return header + b"".join(records) + b"".join(removed)
+
+
+def decode_snapshot(data, history):
+    """解码增量快照，返回 (snapshot_id, base_id, input_ack, {玩家 id: 量化状态})
+
+    history 是客户端保存的 {快照 id: 状态}，增量基准从里面取。
+    """
+    _, snapshot_id, base_id, input_ack, changed, removed = _SNAPSHOT.unpack_from(data)
+    if base_id and base_id not in history:
+        raise ValueError(f"缺少增量基准快照 {base_id}")
+    states = dict(history[base_id]) if base_id else {}
+    offset = _SNAPSHOT.size
+    for _ in range(changed):
+        player_id, mask = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        state = list(states.get(player_id, (0,) * len(STATE_FIELDS)))
+        for i, field in enumerate(_FIELD_STRUCTS):
+            if mask & (1 << i):
+                state[i], = field.unpack_from(data, offset)
+                offset += field.size
+        states[player_id] = tuple(state)
+    for _ in range(removed):
+        player_id, = _REMOVED.unpack_from(data, offset)
+        offset += _REMOVED.size
+        states.pop(player_id, None)
+    return snapshot_id, base_id, input_ack, states
@@ -0,0 +1,261 @@
+## 迷宫网格射线查询（Amanatides–Woo 体素遍历）
+# 迷宫是 2.5D 的：每个格子要么是墙（从 FLOOR_Y 到 WALL_TOP 的实心柱），要么是通路（只有地面）。
+# 射线只在 XZ 平面上按格子步进，开销和经过的格子数成正比，与方块总数无关。
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from maze_data import CELL_SIZE, FLOOR_Y, WALL_TOP
+from world import CELL_WALL
+
+# 命中面的编号（被命中格子的哪个面）
+FACE_NONE = -1  # 起点就在墙里面
+FACE_NEG_X = 0
+FACE_POS_X = 1
+FACE_NEG_Y = 2
+FACE_POS_Y = 3  # 墙顶或地面
+FACE_NEG_Z = 4
+FACE_POS_Z = 5
+FACE_NAMES = ("-x", "+x", "-y", "+y", "-z", "+z")
+
+# cell: (x, z) 格子坐标；face: 上面的面编号；distance: 沿单位方向的距离；
+# point: 命中点世界坐标；solid: 命中的是墙（False 表示地面）
+RayHit = namedtuple("RayHit", ["cell", "face", "distance", "point", "solid"])
+
+
+def _clip_to_grid(o, d, size, cell_size):
+    """射线与网格包围盒（XZ）求交，返回 (t_near, t_far, 进入面)"""
+    half = cell_size / 2
+    t_near, t_far = -math.inf, math.inf
+    face = FACE_NONE
+    for axis, n, neg_face, pos_face in ((0, size[0], FACE_NEG_X, FACE_POS_X),
+                                        (2, size[1], FACE_NEG_Z, FACE_POS_Z)):
+        lo, hi = -half, n * cell_size - half
+        if d[axis] == 0:
+            if not lo <= o[axis] <= hi:
+                return math.inf, -math.inf, face
+            continue
+        t1 = (lo - o[axis]) / d[axis]
+        t2 = (hi - o[axis]) / d[axis]
+        if t1 > t2:
+            t1, t2 = t2, t1
+        if t1 > t_near:
+            t_near = t1
+            face = neg_face if d[axis] > 0 else pos_face
+        t_far = min(t_far, t2)
+    return t_near, t_far, face
+
+
+def raycast(grid, origin, direction, max_distance=100.0,
+            cell_size=CELL_SIZE, floor_y=FLOOR_Y, wall_top=WALL_TOP):
+    """沿射线查找第一个命中的格子，没有命中返回 None
+
+    grid 是按 [z, x] 索引的二维 numpy 数组（0/1 布局或 World.cells），值为 CELL_WALL 的格子是墙。
+    origin/direction 可以直接传 Camera.position 和 Camera.front。
+    """
+    o = [float(v) for v in origin]
+    d = [float(v) for v in direction]
+    length = math.sqrt(d[0] * d[0] + d[1] * d[1] + d[2] * d[2])
+    if length == 0:
+        return None
+    d = [v / length for v in d]
+
+    rows, cols = grid.shape
+    t_start, t_end, face = _clip_to_grid(o, d, (cols, rows), cell_size)
+    if t_start <= 0:
+        t_start, face = 0.0, FACE_NONE
+    t_end = min(t_end, max_distance)
+    if t_start > t_end:
+        return None
+
+    half = cell_size / 2
+    ix = min(max(int(math.floor((o[0] + d[0] * t_start + half) / cell_size)), 0), cols - 1)
+    iz = min(max(int(math.floor((o[2] + d[2] * t_start + half) / cell_size)), 0), rows - 1)
+
+    # 每个轴上：步进方向、穿过一个格子需要的 t、到下一条格线的 t
+    step_x = 1 if d[0] > 0 else -1
+    step_z = 1 if d[2] > 0 else -1
+    t_delta_x = cell_size / abs(d[0]) if d[0] != 0 else math.inf
+    t_delta_z = cell_size / abs(d[2]) if d[2] != 0 else math.inf
+    t_max_x = ((ix + (step_x > 0)) * cell_size - half - o[0]) / d[0] if d[0] != 0 else math.inf
+    t_max_z = ((iz + (step_z > 0)) * cell_size - half - o[2]) / d[2] if d[2] != 0 else math.inf
+
+    t_enter = t_start
+    while True:
+        t_exit = min(t_max_x, t_max_z, t_end)
+        y_enter = o[1] + d[1] * t_enter
+        solid = grid[iz, ix] == CELL_WALL
+
+        hit_t, hit_face = None, face
+        if solid:
+            if floor_y <= y_enter <= wall_top:
+                # 从侧面进入墙柱
+                hit_t = t_enter
+            elif y_enter > wall_top and d[1] < 0:
+                # 从上方落到墙顶
+                t_top = (wall_top - o[1]) / d[1]
+                if t_top <= t_exit:
+                    hit_t, hit_face = t_top, FACE_POS_Y
+        elif d[1] < 0:
+            # 通路格子里只会打到地面
+            t_floor = (floor_y - o[1]) / d[1]
+            if t_enter <= t_floor <= t_exit:
+                hit_t, hit_face = t_floor, FACE_POS_Y
+
+        if hit_t is not None:
+            point = np.array([o[0] + d[0] * hit_t, o[1] + d[1] * hit_t, o[2] + d[2] * hit_t],
+                             dtype=np.float32)
+            return RayHit((ix, iz), hit_face, hit_t, point, bool(solid))
+
+        # 已经飞出墙顶或钻到地面以下，后面不可能再命中
+        if (y_enter > wall_top and d[1] >= 0) or (y_enter < floor_y and d[1] <= 0):
+            return None
+        if t_exit >= t_end:
+            return None
+
+        # 走到下一个格子
+        if t_max_x < t_max_z:
+            ix += step_x
+            t_enter = t_max_x
+            t_max_x += t_delta_x
+            face = FACE_NEG_X if step_x > 0 else FACE_POS_X
+        else:
+            iz += step_z
+            t_enter = t_max_z
+            t_max_z += t_delta_z
+            face = FACE_NEG_Z if step_z > 0 else FACE_POS_Z
+        if not (0 <= ix < cols and 0 <= iz < rows):
+            return None
+
+
+def raycast_batch(grid, origins, directions, max_distance=100.0,
+                  cell_size=CELL_SIZE, floor_y=FLOOR_Y, wall_top=WALL_TOP):
+    """批量射线查询，所有射线同时步进
+
+    origins/directions 形状为 (N, 3)，max_distance 可以是标量或 (N,) 数组。
+    返回 (hit, cells, faces, distances)：
+    hit (N,) bool，cells (N, 2) int32 的 (x, z)，faces (N,) int8，distances (N,) float32。
+    没命中的射线 cells 为 -1，distances 为 inf。
+    """
+    o = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+    d = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+    n = len(o)
+    rows, cols = grid.shape
+    half = cell_size / 2
+
+    hit = np.zeros(n, dtype=bool)
+    cells = np.full((n, 2), -1, dtype=np.int32)
+    faces = np.full(n, FACE_NONE, dtype=np.int8)
+    distances = np.full(n, np.inf, dtype=np.float32)
+
+    length = np.linalg.norm(d, axis=1)
+    valid = length > 0
+    d[valid] /= length[valid, None]
+    t_end = np.broadcast_to(np.asarray(max_distance, dtype=np.float64), (n,)).copy()
+
+    # 和网格包围盒求交（两个轴的 slab）
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_near = np.zeros(n)
+        t_far = t_end.copy()
+        face = np.full(n, FACE_NONE, dtype=np.int8)
+        for axis, size, neg_face, pos_face in ((0, cols, FACE_NEG_X, FACE_POS_X),
+                                               (2, rows, FACE_NEG_Z, FACE_POS_Z)):
+            lo, hi = -half, size * cell_size - half
+            da = d[:, axis]
+            oa = o[:, axis]
+            t1 = (lo - oa) / da
+            t2 = (hi - oa) / da
+            flat = da == 0
+            inside = (oa >= lo) & (oa <= hi)
+            t1 = np.where(flat, np.where(inside, -np.inf, np.inf), t1)
+            t2 = np.where(flat, np.where(inside, np.inf, -np.inf), t2)
+            tn = np.minimum(t1, t2)
+            tf = np.maximum(t1, t2)
+            entered = tn > t_near
+            face = np.where(entered, np.where(da > 0, neg_face, pos_face), face).astype(np.int8)
+            t_near = np.maximum(t_near, tn)
+            t_far = np.minimum(t_far, tf)
+
+        act = np.nonzero(valid & (t_near <= t_far))[0]
+        o, d, t_enter, t_end, face = o[act], d[act], t_near[act], t_far[act], face[act]
+
+        p = o + d * t_enter[:, None]
+        ix = np.clip(np.floor((p[:, 0] + half) / cell_size).astype(np.int64), 0, cols - 1)
+        iz = np.clip(np.floor((p[:, 2] + half) / cell_size).astype(np.int64), 0, rows - 1)
+
+        step_x = np.where(d[:, 0] > 0, 1, -1)
+        step_z = np.where(d[:, 2] > 0, 1, -1)
+        t_delta_x = np.where(d[:, 0] != 0, cell_size / np.abs(d[:, 0]), np.inf)
+        t_delta_z = np.where(d[:, 2] != 0, cell_size / np.abs(d[:, 2]), np.inf)
+        t_max_x = np.where(d[:, 0] != 0,
+                           ((ix + (step_x > 0)) * cell_size - half - o[:, 0]) / d[:, 0], np.inf)
+        t_max_z = np.where(d[:, 2] != 0,
+                           ((iz + (step_z > 0)) * cell_size - half - o[:, 2]) / d[:, 2], np.inf)
+        t_top = (wall_top - o[:, 1]) / d[:, 1]
+        t_floor = (floor_y - o[:, 1]) / d[:, 1]
+
+    # 每轮所有存活射线前进一格，命中或出界就移出活动集合
+    while len(act):
+        t_exit = np.minimum(np.minimum(t_max_x, t_max_z), t_end)
+        y_enter = o[:, 1] + d[:, 1] * t_enter
+        down = d[:, 1] < 0
+        solid = grid[iz, ix] == CELL_WALL
+
+        side = solid & (y_enter >= floor_y) & (y_enter <= wall_top)
+        top = solid & ~side & down & (y_enter > wall_top) & (t_top <= t_exit)
+        ground = ~solid & down & (t_floor >= t_enter) & (t_floor <= t_exit)
+        found = side | top | ground
+
+        if found.any():
+            sel = act[found]
+            hit[sel] = True
+            cells[sel, 0] = ix[found]
+            cells[sel, 1] = iz[found]
+            faces[sel] = np.where(side[found], face[found], FACE_POS_Y)
+            distances[sel] = np.where(side[found], t_enter[found],
+                                      np.where(top[found], t_top[found], t_floor[found]))
+
+        gone = (found | (t_exit >= t_end) |
+                ((y_enter > wall_top) & (d[:, 1] >= 0)) |
+                ((y_enter < floor_y) & (d[:, 1] <= 0)))
+
+        x_first = t_max_x < t_max_z
+        ix = ix + np.where(x_first, step_x, 0)
+        iz = iz + np.where(x_first, 0, step_z)
+        t_enter = np.where(x_first, t_max_x, t_max_z)
+        t_max_x = t_max_x + np.where(x_first, t_delta_x, 0)
+        t_max_z = t_max_z + np.where(x_first, 0, t_delta_z)
+        face = np.where(x_first,
+                        np.where(step_x > 0, FACE_NEG_X, FACE_POS_X),
+                        np.where(step_z > 0, FACE_NEG_Z, FACE_POS_Z)).astype(np.int8)
+        gone |= (ix < 0) | (ix >= cols) | (iz < 0) | (iz >= rows)
+
+        keep = ~gone
+        act = act[keep]
+        o, d, t_end, face = o[keep], d[keep], t_end[keep], face[keep]
+        ix, iz, step_x, step_z = ix[keep], iz[keep], step_x[keep], step_z[keep]
+        t_enter, t_max_x, t_max_z = t_enter[keep], t_max_x[keep], t_max_z[keep]
+        t_delta_x, t_delta_z = t_delta_x[keep], t_delta_z[keep]
+        t_top, t_floor = t_top[keep], t_floor[keep]
+
+    return hit, cells, faces, distances
+
+
+def line_of_sight(grid, a, b, **kwargs):
+    """a 点能否看到 b 点（中间没有墙或地面遮挡）"""
+    delta = np.asarray(b, dtype=np.float64) - np.asarray(a, dtype=np.float64)
+    dist = float(np.linalg.norm(delta))
+    if dist == 0:
+        return True
+    result = raycast(grid, a, delta, max_distance=dist, **kwargs)
+    return result is None or result.distance >= dist - 1e-6
+
+
+def line_of_sight_batch(grid, origins, targets, **kwargs):
+    """批量视线检测，用于大量机器人互相可见性判断，返回 (N,) bool"""
+    origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+    delta = np.asarray(targets, dtype=np.float64).reshape(-1, 3) - origins
+    dist = np.linalg.norm(delta, axis=1)
+    hit, _, _, distances = raycast_batch(grid, origins, delta, max_distance=dist, **kwargs)
+    return ~hit | (distances >= dist - 1e-6)
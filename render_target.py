@@ -0,0 +1,60 @@
+## 离屏渲染目标
+# 场景先画到一块和窗口一样大的 FBO 的左下角（按缩放比例），再放大拷贝到窗口。
+# FBO 只分配一次，缩放比例变化时只改视口，不重新分配显存。
+from OpenGL.GL import *
+
+
+def framebuffers_supported():
+    """驱动是否支持 FBO 和 glBlitFramebuffer（OpenGL 3.0 / ARB_framebuffer_object）"""
+    try:
+        return bool(glGenFramebuffers) and bool(glBlitFramebuffer)
+    except Exception:
+        return False
+
+
+class RenderTarget:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.render_width = width
+        self.render_height = height
+
+        self.framebuffer = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+
+        self.color_buffer = glGenRenderbuffers(1)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.color_buffer)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self.color_buffer)
+
+        self.depth_buffer = glGenRenderbuffers(1)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.depth_buffer)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, width, height)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, self.depth_buffer)
+
+        status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
+        glBindRenderbuffer(GL_RENDERBUFFER, 0)
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        if status != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError(f"离屏渲染目标不完整: 0x{status:x}")
+
+    def begin(self, scale):
+        """开始往离屏目标渲染，scale 是相对窗口的分辨率比例"""
+        self.render_width = max(1, int(self.width * scale))
+        self.render_height = max(1, int(self.height * scale))
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        glViewport(0, 0, self.render_width, self.render_height)
+
+    def end(self, dest=None, window_size=None):
+        """把渲染结果线性缩放拷贝到窗口，之后的绘制（准星等）直接画在窗口上
+
+        dest 是窗口里的目标矩形 (x, y, w, h)，默认整个窗口（和渲染目标一样大）；
+        window_size 是拷贝完要恢复的视口大小，默认同渲染目标。
+        """
+        x, y, w, h = dest if dest is not None else (0, 0, self.width, self.height)
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.framebuffer)
+        glBindFramebuffer(GL_DRAW_FRAMEBUFFER, 0)
+        glBlitFramebuffer(0, 0, self.render_width, self.render_height,
+                          x, y, x + w, y + h, GL_COLOR_BUFFER_BIT, GL_LINEAR)
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        glViewport(0, 0, *(window_size or (self.width, self.height)))
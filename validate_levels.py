@@ -0,0 +1,242 @@
+## 关卡批量校验和统计
+# 生成的关卡发布前批量检查：入口出口是通路、出口可达、没有走不到的死区，
+# 并统计最短路径长度和死胡同数量。每个迷宫交给进程池里的一个任务，
+# 连通分量和 BFS 距离都是整批 numpy 运算，结果按列写进一个 .npz 文件。
+# 运行：python validate_levels.py --seeds 1000 --size 64 [--workers 4] [-o results.npz]
+#       python validate_levels.py levels/*.npz
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from maze_data import generate_maze
+
+# 结果文件的列，顺序即输出顺序
+COLUMNS = (
+    "source", "rows", "cols", "open_cells", "entrance_open", "exit_open", "components",
+    "reachable", "unreachable_cells", "path_length", "max_distance", "mean_distance",
+    "dead_ends", "junctions", "valid", "analyze_ms", "error",
+)
+
+# 读取或检查出错的关卡整行用这些值（valid 为 False），error 列是异常信息
+_FAILED_ROW = {
+    "rows": -1, "cols": -1, "open_cells": -1, "entrance_open": False, "exit_open": False,
+    "components": -1, "reachable": False, "unreachable_cells": -1, "path_length": -1,
+    "max_distance": -1, "mean_distance": -1.0, "dead_ends": -1, "junctions": -1,
+    "valid": False, "analyze_ms": 0.0,
+}
+
+
+def label_components(open_cells):
+    """四连通分量标记（并行挂接 + 指针跳跃），返回 [z, x] 的标签网格，墙为 -1
+
+    每个通路格子一开始指向自己；每轮把每条边两端所在树中编号大的根挂到小的根上，
+    再反复 parent = parent[parent] 压平，直到没有跨树的边。标签是分量里最小的格子编号。
+    """
+    rows, cols = open_cells.shape
+    index = np.arange(rows * cols).reshape(rows, cols)
+    horizontal = open_cells[:, :-1] & open_cells[:, 1:]
+    vertical = open_cells[:-1, :] & open_cells[1:, :]
+    u = np.concatenate([index[:, :-1][horizontal], index[:-1, :][vertical]])
+    v = np.concatenate([index[:, 1:][horizontal], index[1:, :][vertical]])
+
+    parent = np.arange(rows * cols)
+    while True:
+        pu, pv = parent[u], parent[v]
+        cross = pu != pv
+        if not cross.any():
+            break
+        low = np.minimum(pu[cross], pv[cross])
+        high = np.maximum(pu[cross], pv[cross])
+        np.minimum.at(parent, high, low)
+        # 指针跳跃：每个格子直接指向根
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+    labels = parent.reshape(rows, cols)
+    return np.where(open_cells, labels, -1)
+
+
+def bfs_distances(open_cells, start):
+    """从 start 格子 (x, z) 出发的 BFS 步数，走不到的格子和墙为 -1
+
+    每一步把整个前沿（格子编号数组）一起向四个方向扩展，步数等于最远距离，与格子总数无关。
+    """
+    rows, cols = open_cells.shape
+    flat_open = open_cells.ravel()
+    distances = np.full(rows * cols, -1, dtype=np.int32)
+    first = start[1] * cols + start[0]
+    if not flat_open[first]:
+        return distances.reshape(rows, cols)
+
+    distances[first] = 0
+    frontier = np.array([first])
+    step = 0
+    while len(frontier):
+        step += 1
+        x = frontier % cols
+        neighbours = np.concatenate([
+            frontier[x > 0] - 1,
+            frontier[x < cols - 1] + 1,
+            frontier[frontier >= cols] - cols,
+            frontier[frontier < (rows - 1) * cols] + cols,
+        ])
+        neighbours = neighbours[flat_open[neighbours] & (distances[neighbours] < 0)]
+        frontier = np.unique(neighbours)
+        distances[frontier] = step
+    return distances.reshape(rows, cols)
+
+
+def open_neighbour_counts(open_cells):
+    """每个格子四周的通路格子数"""
+    padded = np.pad(open_cells, 1, constant_values=False).astype(np.int8)
+    return padded[:-2, 1:-1] + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:]
+
+
+def analyze_level(layout, entrance, exit):
+    """检查一个关卡（0/1 布局，入口出口是 (x, z)），返回 COLUMNS 里除 source、error 以外各项组成的字典
+
+    直接看原始布局而不是 World：World.from_layout 会把入口出口格子改成通路，查不出被墙堵住的入口。
+    布局不是二维、入口出口不在网格里时抛 ValueError。
+    """
+    start = time.perf_counter()
+    open_cells = np.asarray(layout) == 0
+    if open_cells.ndim != 2 or open_cells.size == 0:
+        raise ValueError(f"布局必须是非空的二维数组，实际形状 {open_cells.shape}")
+    rows, cols = open_cells.shape
+    (ex, ez), (xx, xz) = entrance, exit
+    for name, (x, z) in (("入口", entrance), ("出口", exit)):
+        if not (0 <= x < cols and 0 <= z < rows):
+            raise ValueError(f"{name} ({x}, {z}) 不在 {cols}x{rows} 的网格里")
+    entrance_open = bool(open_cells[ez, ex])
+    exit_open = bool(open_cells[xz, xx])
+
+    labels = label_components(open_cells)
+    component_ids = np.unique(labels[open_cells])
+    distances = bfs_distances(open_cells, entrance)
+    reached = distances >= 0
+    open_count = int(open_cells.sum())
+
+    neighbours = open_neighbour_counts(open_cells)
+    dead_end = open_cells & (neighbours == 1)
+    # 入口和出口本身就是尽头，不算死胡同
+    dead_end[ez, ex] = dead_end[xz, xx] = False
+
+    reachable = entrance_open and exit_open and bool(labels[ez, ex] == labels[xz, xx])
+    unreachable = open_count - int(reached.sum())
+    return {
+        "rows": rows,
+        "cols": cols,
+        "open_cells": open_count,
+        "entrance_open": entrance_open,
+        "exit_open": exit_open,
+        "components": len(component_ids),
+        "reachable": reachable,
+        "unreachable_cells": unreachable,
+        "path_length": int(distances[xz, xx]),
+        "max_distance": int(distances.max()),
+        "mean_distance": float(distances[reached].mean()) if reached.any() else -1.0,
+        "dead_ends": int(dead_end.sum()),
+        "junctions": int((open_cells & (neighbours >= 3)).sum()),
+        "valid": reachable and unreachable == 0,
+        "analyze_ms": (time.perf_counter() - start) * 1e3,
+    }
+
+
+def load_level(path):
+    """读取迷宫文件：.npz 含 layout（和可选的 entrance、exit），.npy 只有布局
+
+    没有给出入口出口时按 generate_maze 的约定取左上角和右下角的房间。返回 (布局, 入口, 出口)。
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            layout = data["layout"]
+            entrance = tuple(int(v) for v in data["entrance"]) if "entrance" in data else None
+            exit = tuple(int(v) for v in data["exit"]) if "exit" in data else None
+    else:
+        layout, entrance, exit = np.load(path), None, None
+    rows, cols = layout.shape
+    return layout, entrance or (1, 1), exit or (cols - 2, rows - 2)
+
+
+def _run_job(job):
+    """进程池任务：job 是 ("seed", 种子, 房间数) 或 ("file", 路径)
+
+    出错的关卡不让整批中断，返回 valid 为 False、error 为异常信息的一行。
+    """
+    source = f"seed:{job[1]}" if job[0] == "seed" else job[1]
+    try:
+        if job[0] == "seed":
+            level = generate_maze(job[2], job[2], job[1])
+        else:
+            level = load_level(source)
+        result = analyze_level(*level)
+        result["error"] = ""
+    except Exception as e:
+        result = dict(_FAILED_ROW, error=f"{type(e).__name__}: {e}")
+    result["source"] = source
+    return result
+
+
+def validate(jobs, workers=None, chunksize=16):
+    """用进程池校验所有关卡，按输入顺序返回结果列表；workers 为 1 时在当前进程里跑"""
+    if workers == 1:
+        return [_run_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_job, jobs, chunksize=chunksize))
+
+
+def to_columns(results):
+    """结果列表转成列存储：{列名: numpy 数组}"""
+    return {name: np.array([r[name] for r in results]) for name in COLUMNS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量校验生成的关卡")
+    parser.add_argument("files", nargs="*", help="迷宫文件（.npz 或 .npy）")
+    parser.add_argument("--seeds", type=int, default=0, help="另外校验 generate_maze 的前 N 个种子")
+    parser.add_argument("--seed-start", type=int, default=0)
+    parser.add_argument("--size", type=int, default=64, help="按种子生成时每边的房间数")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    parser.add_argument("--chunksize", type=int, default=16, help="每次发给子进程的任务数")
+    parser.add_argument("-o", "--output", default="level_report.npz", help="结果文件（按列存储的 .npz）")
+    args = parser.parse_args()
+
+    jobs = [("file", path) for path in args.files]
+    jobs += [("seed", seed, args.size) for seed in range(args.seed_start, args.seed_start + args.seeds)]
+    if not jobs:
+        parser.error("没有要校验的关卡：给出迷宫文件或 --seeds N")
+
+    workers = args.workers or os.cpu_count()
+    start = time.perf_counter()
+    results = validate(jobs, workers, args.chunksize)
+    elapsed = time.perf_counter() - start
+
+    columns = to_columns(results)
+    np.savez(args.output, **columns)
+
+    invalid = ~columns["valid"]
+    print(f"校验 {len(results)} 个关卡，{workers} 个进程，{elapsed:.2f} s，{len(results) / elapsed:.1f} 个/秒")
+    lengths = columns["path_length"][columns["reachable"]]
+    if len(lengths):
+        dead_ends = columns["dead_ends"][columns["error"] == ""]
+        print(f"路径长度 平均 {lengths.mean():.1f}，最长 {lengths.max()}；"
+              f"死胡同 平均 {dead_ends.mean():.1f}")
+    print(f"不合格 {int(invalid.sum())} 个，结果写入 {args.output}")
+    for i in np.nonzero(invalid)[0][:10]:
+        if columns["error"][i]:
+            print(f"  {columns['source'][i]}: {columns['error'][i]}")
+            continue
+        print(f"  {columns['source'][i]}: 入口通路={columns['entrance_open'][i]} 出口通路={columns['exit_open'][i]} "
+              f"出口可达={columns['reachable'][i]} 走不到的格子={columns['unreachable_cells'][i]}")
+    sys.exit(1 if invalid.any() else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+## 紧凑的世界数据
+# 整个迷宫只存一张 [z, x] 索引的 uint8 格子网格，每格 1 字节，
+# 不再为每个地面/墙壁方块各存一个 numpy 数组（每个都有上百字节的对象开销）。
+# 渲染、碰撞和地面检测需要的方块坐标都按需从网格切出来。
+import numpy as np
+
+from maze_data import CELL_SIZE, FLOOR_Y, WALL_TOP
+
+# 格子代码，和 materials 里的材质编号一一对应，cells 可以直接当材质网格用
+CELL_FLOOR = 0
+CELL_WALL = 1
+CELL_ENTRANCE = 2
+CELL_EXIT = 3
+
+
+class World:
+    def __init__(self, cells, entrance, exit,
+                 cell_size=CELL_SIZE, floor_y=FLOOR_Y, wall_top=WALL_TOP):
+        self.cells = np.ascontiguousarray(cells, dtype=np.uint8)  # [z, x] 索引的格子代码
+        self.entrance = tuple(entrance)  # 入口格子 (x, z)
+        self.exit = tuple(exit)  # 出口格子 (x, z)
+        self.cell_size = cell_size
+        self.floor_y = floor_y  # 看得见的地面高度（地面方块的中心）
+        self.wall_top = wall_top
+
+    @classmethod
+    def from_layout(cls, layout, entrance, exit, **kwargs):
+        """从 0/1 布局（1 = 墙）创建世界，入口和出口是 (x, z) 格子坐标"""
+        # bool 数组直接按 uint8 解释：True -> CELL_WALL，False -> CELL_FLOOR，不多分配一份
+        cells = (np.asarray(layout) != 0).view(np.uint8)
+        cells[entrance[1], entrance[0]] = CELL_ENTRANCE
+        cells[exit[1], exit[0]] = CELL_EXIT
+        return cls(cells, entrance, exit, **kwargs)
+
+    @property
+    def shape(self):
+        """(行数, 列数)，即 (z 方向格子数, x 方向格子数)"""
+        return self.cells.shape
+
+    def spawn_position(self, height=2.0):
+        """入口格子上方的出生点"""
+        return np.array([self.entrance[0] * self.cell_size, height, self.entrance[1] * self.cell_size],
+                        dtype=np.float32)
+
+    def cell_at(self, position):
+        """世界坐标所在的格子 (x, z)"""
+        return int(round(position[0] / self.cell_size)), int(round(position[2] / self.cell_size))
+
+    def cubes_around(self, position, radius=1):
+        """position 周围 (2 * radius + 1)^2 个格子里的方块中心，返回 (K, 3) float32
+
+        每个格子一个地面方块（y = floor_y），墙格子再加两个墙壁方块，
+        和原来 create_maze 的方块列表格式一致，可以直接传给 Camera 的碰撞和地面检测。
+        """
+        rows, cols = self.cells.shape
+        cx, cz = self.cell_at(position)
+        x0, x1 = max(cx - radius, 0), min(cx + radius + 1, cols)
+        z0, z1 = max(cz - radius, 0), min(cz + radius + 1, rows)
+        if x0 >= x1 or z0 >= z1:
+            return np.empty((0, 3), dtype=np.float32)
+
+        zs, xs = np.mgrid[z0:z1, x0:x1]
+        xs = xs.ravel() * self.cell_size
+        zs = zs.ravel() * self.cell_size
+        wall = self.cells[z0:z1, x0:x1].ravel() == CELL_WALL
+        wx, wz = xs[wall], zs[wall]
+        # 墙壁方块从地面往上叠两层
+        lower = self.floor_y + 1
+        upper = self.floor_y + 3
+        return np.concatenate([
+            np.column_stack([xs, np.full(len(xs), self.floor_y), zs]),
+            np.column_stack([wx, np.full(len(wx), lower), wz]),
+            np.column_stack([wx, np.full(len(wx), upper), wz]),
+        ]).astype(np.float32)